@@ -0,0 +1,243 @@
+import argparse
+import os
+import time
+
+import numpy as np
+
+import QTableFile
+from StateEngine import getEngine
+
+# Number of levels of the pre-learning, the games of level i are solved in at most i moves
+PRETRAIN_LEVELS = 31
+
+
+class BatchTrainer:
+    """
+    Q-learning of the 8 puzzle on many independent episodes advanced in lockstep:
+    at each step, every running episode selects its action epsilon-greedily, moves
+    with the nextState table of the StateEngine and updates its Q-value, with array
+    operations over the whole batch.
+
+    The transitions are deterministic, so the episodes updating the same
+    (state, action) pair in a step compute the same value and the scatter update
+    is the update of AIPlayer.playRound applied once.
+    """
+
+    def __init__(
+        self,
+        qTable,
+        epsilon=0.5,
+        gamma=0.4,
+        learningSteps=60000,
+        nbPlayedGames=1,
+        seed=None,
+    ):
+        """
+        :param qTable:          The (9!, 4) float32 array updated in place.
+        :param epsilon:         The probability of exploring a random move.
+        :param gamma:           The discount factor of the Bellman equation.
+        :param learningSteps:   The number of games after which the learning rate is divided by 10.
+        :param nbPlayedGames:   The number of games already played with the Q-Table.
+        :param seed:            The seed of the random generator.
+        """
+        self.qTable = qTable
+        self.epsilon = epsilon
+        self.gamma = gamma
+        self.learningSteps = learningSteps
+        self.nbPlayedGames = nbPlayedGames
+        self.engine = getEngine()
+        self.rng = np.random.default_rng(seed)
+        self.nbMoves = 0
+
+    def getAlpha(self):
+        """
+        :return: The learning rate of AIPlayer.getAlpha for the current number of played games.
+        """
+        return 1 / (
+            10 ** ((self.nbPlayedGames + self.learningSteps) / self.learningSteps)
+        )
+
+    def selectActions(self, states):
+        """
+        Epsilon-greedy selection of an action for each state, the ties between the
+        maximum Q-values being broken at random.
+
+        :param states:  The array of the ranks of the states.
+        :return:        The array of the actions.
+        """
+        qValues = self.qTable[states]
+        best = qValues == qValues.max(axis=1, keepdims=True)
+        greedy = np.argmax(self.rng.random(qValues.shape) * best, axis=1)
+        explore = self.rng.random(len(states)) < self.epsilon
+        return np.where(explore, self.rng.integers(0, 4, len(states)), greedy)
+
+    def step(self, states):
+        """
+        Play one move in each episode and update the Q-Table.
+
+        :param states:  The array of the ranks of the current states.
+        :return:        The array of the ranks of the next states.
+        """
+        actions = self.selectActions(states)
+        nextStates = self.engine.nextState[states, actions]
+        rewards = self.engine.isGoal[nextStates]
+        old = self.qTable[states, actions]
+        self.qTable[states, actions] = old + self.getAlpha() * (
+            rewards + self.gamma * self.qTable[nextStates].max(axis=1) - old
+        )
+        self.nbMoves += len(states)
+        return nextStates
+
+    def run(self, states, maxMoves=None):
+        """
+        Play the episodes starting from the given states until they reach the goal.
+
+        :param states:      The array of the ranks of the initial states.
+        :param maxMoves:    The number of moves after which an episode is stopped, None for no limit.
+                            As in AIPlayer.initLearning, the moves leaving the grid are not counted.
+        :return:            The boolean array of the episodes that reached the goal.
+        """
+        states = np.asarray(states, dtype=np.int64).copy()
+        nbMoves = np.zeros(len(states), dtype=np.int64)
+        running = np.flatnonzero(~self.engine.isGoal[states])
+        while running.size != 0:
+            nextStates = self.step(states[running])
+            nbMoves[running] += nextStates != states[running]
+            states[running] = nextStates
+            running = running[~self.engine.isGoal[nextStates]]
+            if maxMoves is not None:
+                running = running[nbMoves[running] < maxMoves]
+        return self.engine.isGoal[states]
+
+    def randomStates(self, nbGames):
+        """
+        :return: The ranks of nbGames random states from which the goal can be reached.
+        """
+        return self.rng.choice(np.flatnonzero(self.engine.reachable), nbGames)
+
+    def nStepsStates(self, nbMoves, nbGames):
+        """
+        Random walks of nbMoves moves from the goal, as AIPlayer.generateNStepsGame:
+        the moves leaving the grid or going back to the goal are not counted.
+
+        :return: The ranks of nbGames states solved in at most nbMoves moves.
+        """
+        goal = self.engine.goal
+        states = np.full(nbGames, goal, dtype=np.int64)
+        remaining = np.full(nbGames, nbMoves)
+        while remaining.any():
+            actions = self.rng.integers(0, 4, nbGames)
+            nextStates = self.engine.nextState[states, actions]
+            moved = (remaining > 0) & (nextStates != goal) & (nextStates != states)
+            states[moved] = nextStates[moved]
+            remaining[moved] -= 1
+        return states
+
+    def initLearning(self, typeGame, nbGames):
+        """
+        Batch version of AIPlayer.initLearning: play games solved in at most typeGame moves,
+        stopped after typeGame * 100 moves, until nbGames of them are won.
+
+        :return: The number of played episodes.
+        """
+        won = 0
+        episodes = 0
+        while won < nbGames:
+            solved = self.run(self.nStepsStates(typeGame, nbGames - won), typeGame * 100)
+            won += int(solved.sum())
+            episodes += len(solved)
+        return episodes
+
+    def preTrain(self, nbGames=100, progress=None):
+        """
+        Batch version of AIPlayer.preTrain, nbGames games of each level.
+
+        :param progress:    Function called with the fraction of the levels done.
+        :return:            The number of played episodes.
+        """
+        episodes = 0
+        for level in range(PRETRAIN_LEVELS):
+            episodes += self.initLearning(level + 1, nbGames)
+            if progress is not None:
+                progress((level + 1) / PRETRAIN_LEVELS)
+        return episodes
+
+    def train(self, nbGames, batchSize=4096):
+        """
+        Batch version of AIPlayer.train: play nbGames random games, batchSize at a time.
+
+        :return: The number of played episodes.
+        """
+        played = 0
+        while played < nbGames:
+            size = min(batchSize, nbGames - played)
+            self.run(self.randomStates(size))
+            self.nbPlayedGames += size
+            played += size
+        return played
+
+    def meta(self):
+        """
+        :return: The parameters of the AIPlayer saved with the Q-Table.
+        """
+        return {
+            "nbPlayedGames": self.nbPlayedGames,
+            "epsilon": self.epsilon,
+            "gamma": self.gamma,
+            "learningSteps": self.learningSteps,
+        }
+
+
+def report(name, episodes, nbMoves, elapsed):
+    print(
+        f"{name}: {episodes} episodes, {nbMoves} moves in {elapsed:.2f}s,",
+        f"{episodes / elapsed if elapsed > 0 else 0:.0f} episodes/s,",
+        f"{nbMoves / elapsed if elapsed > 0 else 0:.0f} moves/s",
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Train a Q-Table of the 8 puzzle without the game window."
+    )
+    parser.add_argument(
+        "model", type=str, help="The .npy Q-Table, created if it does not exist."
+    )
+    parser.add_argument(
+        "--pretrain",
+        type=int,
+        help="Number of pre-learning games of each level, 0 for none.",
+        default=0,
+    )
+    parser.add_argument(
+        "--games", type=int, help="Number of random training games.", default=0
+    )
+    parser.add_argument(
+        "--batch", type=int, help="Number of episodes played at once.", default=4096
+    )
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    path = QTableFile.npyPath(args.model)
+    if os.path.isfile(path):
+        (qTable, meta) = QTableFile.loadQTable(path)
+    else:
+        (qTable, meta) = (QTableFile.emptyQTable(), dict(QTableFile.DEFAULT_META))
+    trainer = BatchTrainer(qTable, seed=args.seed, **meta)
+
+    if args.pretrain > 0:
+        start = time.time()
+        episodes = trainer.preTrain(args.pretrain)
+        report("Pre-learning", episodes, trainer.nbMoves, time.time() - start)
+    if args.games > 0:
+        trainer.nbMoves = 0
+        start = time.time()
+        episodes = trainer.train(args.games, args.batch)
+        report("Training", episodes, trainer.nbMoves, time.time() - start)
+
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    QTableFile.saveQTable(path, trainer.qTable, trainer.meta())
+
+
+if __name__ == "__main__":
+    main()
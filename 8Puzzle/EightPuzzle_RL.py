@@ -1,7 +1,10 @@
-import math
 import os
-from random import random, randint
+from random import random, randint, Random
 from Game_UI import SlidePuzzle, WIDTH, HEIGHT
+from Oracle import Oracle, stringToState, stateToString
+from BatchTrainer import BatchTrainer
+import QTableFile
+from StateEngine import getEngine, rankPermutation
 import pygame
 
 
@@ -54,19 +57,16 @@ def initPlayerAI(puzzle, modelAI, nbGames=100):
 
         puzzle.drawBar(pos, size, borderC, barC, 0.0)
 
-        # Pre-Learning.
-        for i in range(31):
-            for j in range(nbGames):
-                AI.initLearning(i + 1, 1)
-                puzzle.drawBar(
-                    pos,
-                    size,
-                    borderC,
-                    barC,
-                    (i * nbGames + j + 1) / (31 * nbGames),
-                )
-                for event in pygame.event.get():
-                    puzzle.catchExitEvent(event)
+        def progress(ratio):
+            puzzle.drawBar(pos, size, borderC, barC, ratio)
+            for event in pygame.event.get():
+                puzzle.catchExitEvent(event)
+
+        # Pre-Learning, the games of each level are played at once.
+        trainer = BatchTrainer(
+            AI.qTable, AI.epsilon, AI.gamma, AI.learningSteps, AI.nbPlayedGames
+        )
+        trainer.preTrain(nbGames, progress)
         AI.saveQTable()
     return AI
 
@@ -97,17 +97,29 @@ class AIPlayer:
 
         # A permutations of the string "123456789" corresponds to possible state
         # of the game. And in each state, we can make 4 actions [up, right, down, left].
-        # The Q-Table is indexed in the lexicographical order of the string representing a state.
-        self.qTable = []
+        # The Q-Table is a (9!, 4) float32 array, indexed in the lexicographical order of the
+        # string representing a state. It is saved in a .npy file and the parameters above
+        # in a JSON file next to it.
+        self.qTable = None
         self.qTablePath = fileQTable
+        if os.path.splitext(fileQTable)[1] == ".txt":
+            # A Q-Table of the former text format is converted once.
+            if os.path.isfile(fileQTable) and not os.path.isfile(
+                QTableFile.npyPath(fileQTable)
+            ):
+                QTableFile.importText(fileQTable)
+            self.qTablePath = QTableFile.npyPath(fileQTable)
 
         self.puzzle = puzzle
+        # The states are handled as integer ranks, with the precomputed transitions of the engine.
+        self.engine = getEngine()
+        # Table of the optimal moves, loaded on first use to compare the AI with the optimum.
+        self.oracle = None
 
-        if fileQTable != "" and os.path.isfile(fileQTable):
+        if self.qTablePath != "" and os.path.isfile(self.qTablePath):
             self.loadQTable()
         else:
-            for _ in range(math.factorial(9)):
-                self.qTable.append([0.0, 0.0, 0.0, 0.0])
+            self.qTable = QTableFile.emptyQTable()
 
     def moveTileAI(self):
         """
@@ -176,6 +188,7 @@ class AIPlayer:
                     self.saveQTable()
                     self.puzzle.exit()
         self.saveQTable()
+        print("Greedy policy compared with the optimal one:", self.compareWithOracle())
         while True:
             self.puzzle.trainingDiplay(
                 "Training finished, press <m> to access the menu.",
@@ -230,39 +243,33 @@ class AIPlayer:
         :param state:       A string corresponding to a state of the game.
         :return:            A list of Q-Values corresponding to the 4 possible directoins.
         """
-        return self.qTable[findRank(state) - 1].copy()
+        return self.qTable[self.engine.rankOf(state)].tolist()
 
     def saveQTable(self):
         """
-        Saves the QTable in a text file called "QTable.txt".
-        """
-        f = open(self.qTablePath, "w")
-        f.write("{}\n".format(self.nbPlayedGames))
-        f.write("{}\n".format(self.epsilon))
-        f.write("{}\n".format(self.gamma))
-        f.write("{}\n".format(self.learningSteps))
-        for i in range(math.factorial(9)):
-            for j in range(4):
-                f.write("{} ".format(self.qTable[i][j]))
-            f.write("\n")
-        f.close()
+        Saves the QTable in its .npy file and the parameters of the AI in the JSON file next to it.
+        """
+        QTableFile.saveQTable(
+            self.qTablePath,
+            self.qTable,
+            {
+                "nbPlayedGames": self.nbPlayedGames,
+                "epsilon": self.epsilon,
+                "gamma": self.gamma,
+                "learningSteps": self.learningSteps,
+            },
+        )
 
     def loadQTable(self):
         """
-        Loads the QTable contained in the "QTable.txt" file.
-        """
-        f = open(self.qTablePath, "r")
-        self.nbPlayedGames = int(f.readline().strip())
-        self.epsilon = float(f.readline().strip())
-        self.gamma = float(f.readline().strip())
-        self.learningSteps = int(f.readline().strip())
-        for _ in range(math.factorial(9)):
-            directions = []
-            directionValues = f.readline().split()
-            for j in range(4):
-                directions.append(float(directionValues[j]))
-            self.qTable.append(directions)
-        f.close()
+        Loads the QTable contained in the .npy file, opened as a copy-on-write memory map
+        so that loading is immediate, the updates are only written by saveQTable.
+        """
+        self.qTable, meta = QTableFile.loadQTable(self.qTablePath)
+        self.nbPlayedGames = meta["nbPlayedGames"]
+        self.epsilon = meta["epsilon"]
+        self.gamma = meta["gamma"]
+        self.learningSteps = meta["learningSteps"]
 
     def makeMove(self, currentState, direction):
         """
@@ -273,55 +280,14 @@ class AIPlayer:
         :param direction:       An integer corresponding to the direction where we want to move the empty tile.
         :return:                A string corresponding to the next state of the game (after the move).
         """
-        nextState = None
-        emptyTileIndex = currentState.index("9")
-        if direction == self.UP:
-            if emptyTileIndex >= 3:
-                destinationTile = currentState[emptyTileIndex - 3]
-                nextState = (
-                    currentState[0 : emptyTileIndex - 3]
-                    + "9"
-                    + currentState[emptyTileIndex - 2 : emptyTileIndex]
-                    + destinationTile
-                    + currentState[emptyTileIndex + 1 :]
-                )
-        elif direction == self.DOWN:
-            if emptyTileIndex <= 5:
-                destinationTile = currentState[emptyTileIndex + 3]
-                nextState = (
-                    currentState[0:emptyTileIndex]
-                    + destinationTile
-                    + currentState[emptyTileIndex + 1 : emptyTileIndex + 3]
-                    + "9"
-                    + currentState[emptyTileIndex + 4 :]
-                )
-        elif direction == self.LEFT:
-            if emptyTileIndex % 3 != 0:
-                destinationTile = currentState[emptyTileIndex - 1]
-                nextState = (
-                    currentState[0 : emptyTileIndex - 1]
-                    + "9"
-                    + destinationTile
-                    + currentState[emptyTileIndex + 1 :]
-                )
-        else:
-            if emptyTileIndex % 3 != 2:
-                destinationTile = currentState[emptyTileIndex + 1]
-                nextState = (
-                    currentState[0:emptyTileIndex]
-                    + destinationTile
-                    + "9"
-                    + currentState[emptyTileIndex + 2 :]
-                )
-        if nextState == None:
-            nextState = currentState
-        return nextState
+        engine = self.engine
+        return engine.stringOf(engine.nextState[engine.rankOf(currentState), direction])
 
     def selectNewAction(self, currentState):
         """
         Chooses a new action according to the epsilon-greedy selection method.
 
-        :param currentState:    A string corresponding to the current state of the game.
+        :param currentState:    An integer corresponding to the rank of the current state of the game.
         :return:                An integer corresponding to the new action
                                 (i.e. the direction we want to move the empty tile to).
         """
@@ -330,12 +296,12 @@ class AIPlayer:
             return randint(0, 3)
         # With probability 1-epsilon, choose the action corresponding to the maximum reward.
         else:
-            stateIndex = findRank(currentState) - 1
-            maxQValue = max(self.qTable[stateIndex])
+            qValues = self.qTable[currentState]
+            maxQValue = qValues.max()
             # If multiple actions give the maximum value, we randomly choose one of those maximum actions.
             maxIndexes = []
             for i in range(4):
-                if self.qTable[stateIndex][i] == maxQValue:
+                if qValues[i] == maxQValue:
                     maxIndexes.append(i)
             return maxIndexes[randint(0, len(maxIndexes) - 1)]
 
@@ -359,7 +325,8 @@ class AIPlayer:
         oldEpsilon = self.epsilon
         self.epsilon = 0.0
         self.currentSolution = []
-        while state != "123456789":
+        state = self.engine.rankOf(state)
+        while not self.engine.isGoal[state]:
             newAction = self.selectNewAction(state)
             newState = self.playRound(state, newAction)
             if newState != state:
@@ -368,24 +335,72 @@ class AIPlayer:
         self.nbPlayedGames += 1
         self.epsilon = oldEpsilon
 
+    def getOracle(self):
+        """
+        Return the table of the optimal moves, built on first use.
+
+        :return:        The Oracle instance.
+        """
+        if self.oracle is None:
+            self.oracle = Oracle.loadOrBuild()
+        return self.oracle
+
+    def compareWithOracle(self, nbGames=1000, maxMoves=100, seed=0):
+        """
+        Measure how far the greedy policy of the Q-Table is from the optimal one,
+        on random games played without learning.
+
+        :param nbGames:     Integer corresponding to the number of random games.
+        :param maxMoves:    Integer corresponding to the number of moves after which a game is lost.
+        :param seed:        Integer, seed of the random games.
+        :return:            A dictionary with the ratio of solved games, the mean number of
+                            extra moves of the solved games and the ratio of optimal moves.
+        """
+        oracle = self.getOracle()
+        rng = Random(seed)
+        oldEpsilon = self.epsilon
+        self.epsilon = 0.0
+        solved = 0
+        extraMoves = 0
+        optimalMoves = 0
+        totalMoves = 0
+        engine = self.engine
+        for _ in range(nbGames):
+            packedState = oracle.packed.random(rng)
+            optimal = oracle.distance(packedState)
+            state = engine.rankOf(stateToString(packedState))
+            nbMoves = 0
+            while not engine.isGoal[state] and nbMoves < maxMoves:
+                action = self.selectNewAction(state)
+                if action in oracle.optimalMoves(stringToState(engine.stringOf(state))):
+                    optimalMoves += 1
+                totalMoves += 1
+                state = engine.nextState[state, action]
+                nbMoves += 1
+            if engine.isGoal[state]:
+                solved += 1
+                extraMoves += nbMoves - optimal
+        self.epsilon = oldEpsilon
+        return {
+            "solved": solved / nbGames,
+            "extraMoves": extraMoves / solved if solved != 0 else None,
+            "optimalMoves": optimalMoves / totalMoves if totalMoves != 0 else None,
+        }
+
     def playRound(self, state, action):
         """
         Moves a tile and updates the Q-Table.
 
-        :param state:       A string corresponding to the current state of the game.
+        :param state:       An integer corresponding to the rank of the current state of the game.
         :param action:      An integer corresponding to the direction where to move the empty tile.
-        :return:            A string corresponding to the next state of the game (after the move).
+        :return:            An integer corresponding to the rank of the next state of the game (after the move).
         """
-        stateIndex = findRank(state) - 1
-        nextState = self.makeMove(state, action)
-        if nextState == "123456789":
-            reward = 1
-        else:
-            reward = 0
-        self.qTable[stateIndex][action] += self.getAlpha() * (
+        nextState = self.engine.nextState[state, action]
+        reward = 1 if self.engine.isGoal[nextState] else 0
+        self.qTable[state, action] += self.getAlpha() * (
             reward
-            + self.gamma * max(self.qTable[findRank(nextState) - 1])
-            - self.qTable[stateIndex][action]
+            + self.gamma * self.qTable[nextState].max()
+            - self.qTable[state, action]
         )
         return nextState
 
@@ -395,14 +410,14 @@ class AIPlayer:
 
         :param nbMoves:     An integer corresponding to the maximum numbers of moves
                             necessary to solve the game instance.
-        :return:            A string corresponding to an instance of the 8Puzzle game.
+        :return:            An integer corresponding to the rank of an instance of the 8Puzzle game.
         """
-        initState = "123456789"
+        initState = self.engine.goal
         currentState = initState
         # We start by the final state and move away from it.
         while nbMoves > 0:
             newAction = randint(0, 3)
-            newState = self.makeMove(currentState, newAction)
+            newState = self.engine.nextState[currentState, newAction]
             if newState != initState and newState != currentState:
                 currentState = newState
                 nbMoves -= 1
@@ -412,23 +427,13 @@ class AIPlayer:
         """
         Generates a random instance of the 8Puzzle game.
 
-        :return:    A string corresponding to an instance of the game.
+        :return:    An integer corresponding to the rank of an instance of the game.
         """
         # We iterate if we created un unsolvable instance of the game.
-        solvableGame = False
-        game = []
-        while not solvableGame:
-            tiles = [1, 2, 3, 4, 5, 6, 7, 8, 9]
-            game = []
-            for i in range(9):
-                newTileIndex = randint(0, 8 - i)
-                game.append(tiles.pop(newTileIndex))
-            solvableGame = self.puzzle.isSolvable()
-        # We convert the state, encoded as a list, into an integer.
-        stateAsInt = 0
-        for j in range(9):
-            stateAsInt += (10 ** (8 - j)) * game[j]
-        return str(stateAsInt)
+        while True:
+            state = randint(0, len(self.engine.reachable) - 1)
+            if self.engine.reachable[state]:
+                return state
 
     def initLearning(self, typeGame, nbGames):
         """
@@ -443,13 +448,13 @@ class AIPlayer:
         while gamesWon < nbGames:
             state = self.generateNStepsGame(typeGame)
             nbMoves = 0
-            while state != "123456789" and nbMoves < typeGame * 100:
+            while not self.engine.isGoal[state] and nbMoves < typeGame * 100:
                 newAction = self.selectNewAction(state)
                 newState = self.playRound(state, newAction)
                 if newState != state:
                     state = newState
                     nbMoves += 1
-            if state == "123456789":
+            if self.engine.isGoal[state]:
                 gamesWon += 1
 
     def preTrain(self, nbGames=100):
@@ -471,7 +476,7 @@ class AIPlayer:
         nbMoves = 0
         for _ in range(nbGames):
             state = self.generateGame()
-            while state != "123456789":
+            while not self.engine.isGoal[state]:
                 newAction = self.selectNewAction(state)
                 state = self.playRound(state, newAction)
                 nbMoves += 1
@@ -479,43 +484,15 @@ class AIPlayer:
         return nbMoves
 
 
-def findSmallerInRight(string, start, end):
-    """
-    Counts the number of caracters that are smaller than
-    string[start] and are at the right of it.
-
-    :param string:      Input string.
-    :param start:       Integer corresponding to the index of the starting character.
-    :param end:         Integer corresponding to the index of the string.
-    :return:            Integer corresponding to the number of chars, on the right, that are smaller.
-    """
-    countRight = 0
-    i = start + 1
-    while i <= end:
-        if string[i] < string[start]:
-            countRight = countRight + 1
-        i = i + 1
-    return countRight
-
-
 def findRank(string):
     """
     Returns the rank of the given string, considering all the
     possible permutations of the string.
 
-    :param string:      Input string.
-    :return:            An integer corresponding to the rank of the input string.
+    :param string:      Input string, a permutation of "123456789".
+    :return:            An integer corresponding to the rank of the input string, starting at 1.
     """
-    strLen = len(string)
-    mul = math.factorial(strLen)
-    rank = 1
-    i = 0
-    while i < strLen:
-        mul = mul / (strLen - i)
-        countRight = findSmallerInRight(string, i, strLen - 1)
-        rank = rank + countRight * mul
-        i = i + 1
-    return int(rank)
+    return rankPermutation([ord(char) - ord("1") for char in string]) + 1
 
 
 if __name__ == "__main__":
@@ -1,13 +1,20 @@
 import os
 import pygame
 import heapq
+import itertools
 import time
 import sys
 
 from Game_UI import SlidePuzzle
+from PackedPuzzle import PackedPuzzle
+from Heuristics import Manhattan, makeHeuristic
+from Oracle import Oracle
 
 FPS = 60
 
+# Search algorithms of the AI, the oracle is a table of the optimal moves of the 3x3 grid
+SEARCHES = ["astar", "idastar", "oracle"]
+
 
 def main():
     """
@@ -28,12 +35,15 @@ def main():
             puzzle.playHumanGame(fpsclock)
 
 
-def playAIGame(puzzle, fpsclock):
+def playAIGame(puzzle, fpsclock, heuristic="manhattan", search="astar", table=0):
     """
     Play the game with AI.
 
     :param puzzle: The puzzle instance
     :param fpsclock: Track time.
+    :param heuristic: The heuristic of the search, one of Heuristics.HEURISTICS
+    :param search: The search algorithm, one of SEARCHES
+    :param table: Number of entries of the transposition table of IDA*, 0 for none
     """
     finished = False
 
@@ -42,12 +52,13 @@ def playAIGame(puzzle, fpsclock):
 
     # Solve the game with A*
     start = time.time()
-    path = iter(solveAI(puzzle))
+    path = solveAI(puzzle, heuristic, search, table)
     print("Exec time", time.time() - start)
     if path is None:
         print("Error, the AI did not find any solution.")
         pygame.quit()
         sys.exit()
+    path = iter(path)
 
     # reset state of puzzle
     puzzle.tiles = conf_init
@@ -66,71 +77,218 @@ def playAIGame(puzzle, fpsclock):
         finished = puzzle.checkGameState(True)
 
 
-def solveAI(puzzle):
+def solveAI(puzzle, heuristic="manhattan", search="astar", table=0):
     """
     Implementation of the A* algorithm to solve the 8-puzzle game.
+    The search runs on packed states, the puzzle instance is only read.
 
     :param puzzle: The puzzle instance
+    :param heuristic: The heuristic of the search, one of Heuristics.HEURISTICS
+    :param search: The search algorithm, one of SEARCHES
+    :param table: Number of entries of the transposition table of IDA*, 0 for none
     :return: The sequence of positions of the blank tile in order to solve the puzzle.
              This corresponds to the path to go from the initial to the winning configuration.
+             None if there is no solution.
     """
-    start = puzzle.tiles
-    q = [(0, start, [start[-1]])]
-    # We transform q into a priority queue (heapq)
-    heapq.heapify(q)
-    g_scores = {str(start): 0}
+    packed = PackedPuzzle(puzzle.gs)
+    start = packed.encode(puzzle.tiles)
+    stats = {}
+    # the oracle only covers the 3x3 grid, A* is used for the other sizes
+    if search == "oracle" and puzzle.gs == (3, 3):
+        states = oracle(start, stats)
+    elif search == "idastar":
+        states = idastar(packed, start, makeHeuristic(heuristic, packed), table, stats)
+    else:
+        states = astar(packed, start, makeHeuristic(heuristic, packed), stats)
+    print(
+        f"{stats['expanded']} nodes expanded in {stats['time']:.3f}s,",
+        f"{stats['nodes_per_second']:.0f} nodes/s",
+    )
+    if states is None:
+        return None
+    path = [packed.position(packed.blankCell(state)) for state in states]
+    print("Found solution:", path)
+    return path
 
-    while len(q) != 0:
-        current = heapq.heappop(q)
-        puzzle.tiles = current[1]
 
-        if puzzle.isWin():
-            print("Found solution:", current[2])
-            return current[2]
+def _finish(stats, expanded, stored, start_time):
+    """
+    Fill the statistics of a search.
+    """
+    if stats is None:
+        return
+    elapsed = time.perf_counter() - start_time
+    stats["expanded"] = expanded
+    stats["stored"] = stored
+    stats["time"] = elapsed
+    stats["nodes_per_second"] = expanded / elapsed if elapsed > 0 else 0.0
 
-        for m in moves(puzzle):
-            # for all moves, g is the current cost
-            g = g_scores[str(current[1])] + 1
-            # f is the sum of the current cost + heuristic
-            f = g + heuristic(puzzle, m)
-            if str(m) not in g_scores or g < g_scores[str(m)]:
-                heapq.heappush(q, (f, m, current[2] + [m[-1]]))
-                g_scores[str(m)] = g
 
+def oracle(start, stats=None):
+    """
+    Read the optimal solution of a packed 3x3 state in the Oracle table, built on first use.
 
-def moves(puzzle):
+    :param start: The packed initial state.
+    :param stats: Optional dictionary filled as by astar.
+    :return: The list of the states from start to the goal, None if there is no solution.
     """
-    Compute the accessible configurations from the current one with the possible moves.
+    start_time = time.perf_counter()
+    path = Oracle.loadOrBuild().solve(start)
+    _finish(stats, 0 if path is None else len(path), 0, start_time)
+    return path
 
-    :param puzzle: The puzzle instance
-    :return: The sets of accessible configurations.
+
+def astar(packed, start, heuristic=None, stats=None):
     """
-    moves = []
-    potential_neighbors = puzzle.adjacent()
+    A* search from a packed state to the winning configuration, the heuristic being
+    updated for the only tile moved at each step.
 
-    for n in potential_neighbors:
-        if puzzle.inGrid(n):
-            new_tiles = puzzle.tiles.copy()
-            new_tiles[-1] = n
-            pos_n = puzzle.tiles.index(n)
-            new_tiles[pos_n] = puzzle.getBlank()
-            moves.append(new_tiles)
-    return moves
+    :param packed: The PackedPuzzle of the grid.
+    :param start:  The packed initial state.
+    :param heuristic: The heuristic object (see Heuristics), Manhattan distance by default.
+    :param stats: Optional dictionary filled with the number of nodes expanded, the number
+                  of states stored, the time and the nodes expanded per second.
+    :return: The list of the states from start to the goal, None if there is no solution.
+    """
+    start_time = time.perf_counter()
+    expanded = 0
+    if heuristic is None:
+        heuristic = Manhattan(packed)
+    if not packed.isSolvable(start):
+        _finish(stats, 0, 0, start_time)
+        return None
+    update = heuristic.update
+    blank = packed.blankCell(start)
+    info = heuristic.initial(start)
+    moves = packed.moves
+    move = packed.move
+    goal = packed.goal
+    # items in priority queue: (f, h, counter, state, cell of the blank, heuristic information)
+    # equal f are ordered by the deepest state then by insertion, the states are never compared
+    counter = itertools.count()
+    q = [(info[0], info[0], next(counter), start, blank, info)]
+    g_scores = {start: 0}
+    parents = {start: None}
+    closed = set()
 
+    while len(q) != 0:
+        (_, _, _, state, blank, info) = heapq.heappop(q)
+        if state in closed:
+            continue
+        if state == goal:
+            path = []
+            while state is not None:
+                path.append(state)
+                state = parents[state]
+            path.reverse()
+            _finish(stats, expanded, len(g_scores), start_time)
+            return path
+        closed.add(state)
+        expanded += 1
 
-def heuristic(puzzle, n):
+        g = g_scores[state] + 1
+        for cell in moves[blank]:
+            (child, tile) = move(state, blank, cell)
+            if child not in g_scores or g < g_scores[child]:
+                g_scores[child] = g
+                parents[child] = state
+                # the pattern databases are not consistent, a closed state can be
+                # reached again with a smaller cost and is then reopened
+                closed.discard(child)
+                # the tile goes from cell to the former cell of the blank
+                child_info = update(info, state, child, tile, cell, blank)
+                h = child_info[0]
+                heapq.heappush(q, (g + h, h, next(counter), child, cell, child_info))
+    _finish(stats, expanded, len(g_scores), start_time)
+    return None
+
+
+def idastar(packed, start, heuristic=None, table=0, stats=None):
     """
-    Compute the Manhattan distance of all tiles corresponding to the heuristic used in the A* algorithm.
+    IDA* search from a packed state to the winning configuration: depth first searches
+    bounded by f = g + h, the bound being raised to the smallest f above it after each
+    iteration. Only the current path is kept, the memory is linear in the depth.
 
-    :param puzzle: The puzzle instance
-    :param n: Configuration for which we want to compute the total Manhattan distance.
-    :return:  Total Manhattan distances for all tiles in configuration.
+    With table > 0, a transposition table of that many entries, indexed by the state
+    modulo its size and overwritten on collision, prunes the states already expanded
+    in the same iteration with a cost not larger than the current one.
+
+    :param packed: The PackedPuzzle of the grid.
+    :param start:  The packed initial state.
+    :param heuristic: The heuristic object (see Heuristics), Manhattan distance by default.
+    :param table: The number of entries of the transposition table, 0 for none.
+    :param stats: Optional dictionary filled as by astar, with the number of iterations.
+    :return: The list of the states from start to the goal, None if there is no solution.
     """
-    dist = 0
-    for i in range(9):
-        # Sum of Manhattan distances for all tiles
-        dist += abs(n[i][0] - puzzle.winCdt[i][0]) + abs(n[i][1] - puzzle.winCdt[i][1])
-    return dist
+    start_time = time.perf_counter()
+    if heuristic is None:
+        heuristic = Manhattan(packed)
+    if not packed.isSolvable(start):
+        _finish(stats, 0, 0, start_time)
+        return None
+    update = heuristic.update
+    moves = packed.moves
+    move = packed.move
+    goal = packed.goal
+    keys = [-1] * table
+    costs = [0] * table
+    iterations = [0] * table
+    path = [start]
+    expanded = 0
+    iteration = 0
+    found = -1
+
+    def search(state, blank, previous, g, info, bound):
+        nonlocal expanded
+        f = g + info[0]
+        if f > bound:
+            return f
+        if state == goal:
+            return found
+        if table:
+            slot = state % table
+            if keys[slot] == state and iterations[slot] == iteration:
+                if costs[slot] <= g:
+                    return float("inf")
+            keys[slot] = state
+            costs[slot] = g
+            iterations[slot] = iteration
+        expanded += 1
+        minimum = float("inf")
+        for cell in moves[blank]:
+            # never move the blank back where it comes from
+            if cell == previous:
+                continue
+            (child, tile) = move(state, blank, cell)
+            path.append(child)
+            result = search(
+                child,
+                cell,
+                blank,
+                g + 1,
+                update(info, state, child, tile, cell, blank),
+                bound,
+            )
+            if result == found:
+                return found
+            path.pop()
+            if result < minimum:
+                minimum = result
+        return minimum
+
+    info = heuristic.initial(start)
+    bound = info[0]
+    while True:
+        iteration += 1
+        result = search(start, packed.blankCell(start), -1, 0, info, bound)
+        if result == found or result == float("inf"):
+            break
+        bound = result
+
+    _finish(stats, expanded, table, start_time)
+    if stats is not None:
+        stats["iterations"] = iteration
+    return path if result == found else None
 
 
 if __name__ == "__main__":
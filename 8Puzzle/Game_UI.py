@@ -569,8 +569,14 @@ class SlidePuzzle:
         ]
         # Do a natural sort, it is a sort where we sort as follow:
         # [a1, a11, a2, a22] => [a1, a2, a11, a22].
-        reg = re.compile(r"QTable_(\d+).txt")
+        reg = re.compile(r"QTable_(\d+)\.(txt|npy)$")
         onlyfiles = list(filter(lambda f: reg.search(f), onlyfiles))
+        # A text model already converted to .npy is only listed once.
+        onlyfiles = [
+            f
+            for f in onlyfiles
+            if not (f.endswith(".txt") and f[:-4] + ".npy" in onlyfiles)
+        ]
         print(onlyfiles)
         sorted_models = sorted([int(reg.search(f).group(1)) for f in onlyfiles])
         print(sorted_models)
@@ -614,7 +620,7 @@ class SlidePuzzle:
                                 return str(
                                     model_name
                                     / pathlib.Path(
-                                        f"QTable_{sorted_models[-1]+1}.txt"
+                                        f"QTable_{sorted_models[-1]+1}.npy"
                                     )
                                 )
                             else:
@@ -622,7 +628,7 @@ class SlidePuzzle:
                                 return ""
                         else:
                             return str(
-                                model_name / pathlib.Path("QTable_0.txt")
+                                model_name / pathlib.Path("QTable_0.npy")
                             )
                     if event.key == pygame.K_n:
                         return self.selectExistingModel(onlyfiles)
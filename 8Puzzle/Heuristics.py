@@ -0,0 +1,164 @@
+from PackedPuzzle import BITS, MASK
+from PatternDatabase import PatternDatabase, defaultPatterns
+
+# Heuristics of the solvers, selected by name
+HEURISTICS = ["manhattan", "linear", "pdb"]
+
+
+class Manhattan:
+    """
+    Sum of the Manhattan distances of the tiles.
+
+    The heuristics are updated by move: initial() gives the information kept with a
+    state, its first element being the value of the heuristic, and update() gives the
+    information of a child from the information of its parent when a tile slides.
+    """
+
+    def __init__(self, packed):
+        self.packed = packed
+        self.manhattan = packed.manhattan
+
+    def initial(self, state):
+        """
+        :param state: A packed state.
+        :return:      The information of the state, a tuple (h,).
+        """
+        return (self.packed.distance(state),)
+
+    def update(self, info, state, child, tile, source, target):
+        """
+        :param info:   The information of state.
+        :param state:  The packed parent state.
+        :param child:  The packed child state.
+        :param tile:   The tile that moved.
+        :param source: The cell of the tile in state.
+        :param target: The cell of the tile in child.
+        :return:       The information of child.
+        """
+        return (info[0] + self.manhattan[tile][target] - self.manhattan[tile][source],)
+
+
+class LinearConflict(Manhattan):
+    """
+    Manhattan distance plus 2 moves for each tile that has to leave its goal line (row
+    or column) to let the others pass: in a line, the tiles whose goal is in that line and
+    that are not part of the longest sequence already in order.
+    A move only changes the two lines it crosses, the vertical ones for a horizontal move
+    and the horizontal ones for a vertical move.
+    """
+
+    def __init__(self, packed):
+        super().__init__(packed)
+        (width, height) = packed.gs
+        rows = [tuple(x + width * y for x in range(width)) for y in range(height)]
+        columns = [tuple(x + width * y for y in range(height)) for x in range(width)]
+        self.lines = rows + columns
+        # goal of each tile in each line, (line, tile) -> position in the line
+        self.goals = {}
+        for line, cells in enumerate(self.lines):
+            for position, cell in enumerate(cells):
+                if cell != packed.blank:
+                    self.goals[(line, cell)] = position
+        # lines crossing each cell, (row, column)
+        self.crossing = [(y, height + x) for y in range(height) for x in range(width)]
+        self.cache = {}
+
+    def conflicts(self, state, line):
+        """
+        :return: The number of extra moves of the tiles of a line of the state.
+        """
+        # the rows and columns may have different lengths, the line is kept apart from
+        # the tiles so that two lines never share a key
+        tiles = 0
+        for cell in self.lines[line]:
+            tiles = (tiles << BITS) | ((state >> (BITS * cell)) & MASK)
+        key = (line, tiles)
+        value = self.cache.get(key)
+        if value is None:
+            # goal positions of the tiles of this line, in the order they appear
+            goals = []
+            for cell in self.lines[line]:
+                tile = self.packed.tile(state, cell)
+                if (line, tile) in self.goals:
+                    goals.append(self.goals[(line, tile)])
+            # longest increasing subsequence, the lines have at most 4 tiles
+            longest = [1] * len(goals)
+            for i in range(len(goals)):
+                for j in range(i):
+                    if goals[j] < goals[i] and longest[j] + 1 > longest[i]:
+                        longest[i] = longest[j] + 1
+            value = 2 * (len(goals) - max(longest, default=0))
+            self.cache[key] = value
+        return value
+
+    def initial(self, state):
+        return (
+            self.packed.distance(state)
+            + sum(self.conflicts(state, line) for line in range(len(self.lines))),
+        )
+
+    def update(self, info, state, child, tile, source, target):
+        h = info[0] + self.manhattan[tile][target] - self.manhattan[tile][source]
+        (source_row, source_column) = self.crossing[source]
+        (target_row, target_column) = self.crossing[target]
+        if source_row == target_row:
+            changed = (source_column, target_column)
+        else:
+            changed = (source_row, target_row)
+        for line in changed:
+            h += self.conflicts(child, line) - self.conflicts(state, line)
+        return (h,)
+
+
+class AdditivePatternDatabases:
+    """
+    Sum of disjoint pattern databases. The information of a state holds the index of
+    each pattern, a move changes the index of the pattern of the moved tile only.
+    """
+
+    def __init__(self, packed, patterns=None):
+        self.packed = packed
+        if patterns is None:
+            patterns = defaultPatterns(packed.gs)
+        self.databases = [
+            PatternDatabase.loadOrBuild(packed, pattern) for pattern in patterns
+        ]
+        # plain bytes are faster to index than numpy arrays
+        self.tables = [bytes(database.table) for database in self.databases]
+        # pattern and weight of each tile in the index, (-1, 0) for the other tiles
+        self.slots = [(-1, 0)] * packed.size
+        for p, database in enumerate(self.databases):
+            for tile, power in zip(database.pattern, database.powers):
+                self.slots[tile] = (p, power)
+
+    def initial(self, state):
+        indexes = [database.index(state) for database in self.databases]
+        h = sum(table[index] for table, index in zip(self.tables, indexes))
+        return (h, *indexes)
+
+    def update(self, info, state, child, tile, source, target):
+        (p, power) = self.slots[tile]
+        if p < 0:
+            return info
+        table = self.tables[p]
+        index = info[p + 1]
+        moved = index + (target - source) * power
+        info = list(info)
+        info[0] += table[moved] - table[index]
+        info[p + 1] = moved
+        return tuple(info)
+
+
+def makeHeuristic(name, packed):
+    """
+    Give the heuristic called name, one of HEURISTICS.
+
+    :param name:   The name of the heuristic.
+    :param packed: The PackedPuzzle of the grid.
+    :return:       The heuristic object.
+    """
+    if name == "linear":
+        return LinearConflict(packed)
+    if name == "pdb":
+        return AdditivePatternDatabases(packed)
+    return Manhattan(packed)
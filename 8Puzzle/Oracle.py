@@ -0,0 +1,209 @@
+import argparse
+import math
+import os
+import time
+
+from PackedPuzzle import PackedPuzzle
+from PatternDatabase import FOLDER
+
+# Moves of the blank, with the direction numbers of AIPlayer: (dx, dy) of UP, RIGHT, DOWN, LEFT
+DIRECTIONS = [(0, -1), (1, 0), (0, 1), (-1, 0)]
+
+# Number of states reachable from the goal, half of the 9! permutations
+SIZE = math.factorial(9) // 2
+
+# Positions of the tiles other than the blank, for a given cell of the blank
+PERMUTATIONS = math.factorial(8) // 2
+
+DISTANCE_BITS = 5
+
+
+class Oracle:
+    """
+    Optimal solution of every 8 puzzle state, computed once by a breadth first search
+    from the goal and stored as one byte per reachable state: the number of moves to
+    the goal on the low DISTANCE_BITS bits and the direction of an optimal move of the
+    blank above them.
+
+    A state is indexed by cell of the blank * 8! / 2 + rank of the order of the 8 tiles
+    // 2: the parity of that order is fixed by the cell of the blank for the reachable
+    states, and the permutations of ranks 2i and 2i + 1 only differ by a transposition.
+    """
+
+    def __init__(self, table):
+        self.table = table
+        self.packed = PackedPuzzle((3, 3))
+        # directions[cell] is the list of (direction, target cell) of the moves of the blank
+        self.directions = []
+        for cell in range(9):
+            (x, y) = self.packed.position(cell)
+            self.directions.append(
+                [
+                    (direction, x + dx + 3 * (y + dy))
+                    for direction, (dx, dy) in enumerate(DIRECTIONS)
+                    if 0 <= x + dx < 3 and 0 <= y + dy < 3
+                ]
+            )
+
+    @staticmethod
+    def fileName(folder=FOLDER):
+        """
+        :return: The file of the oracle in the folder.
+        """
+        return os.path.join(folder, "oracle_3x3.bin")
+
+    @classmethod
+    def build(cls):
+        """
+        Breadth first search of the whole state space from the goal.
+
+        :return: The Oracle.
+        """
+        oracle = cls(bytearray(SIZE))
+        packed = oracle.packed
+        depth = {packed.goal: 0}
+        frontier = [(packed.goal, packed.blank)]
+        while len(frontier) != 0:
+            following = []
+            for (state, blank) in frontier:
+                for (_, cell) in oracle.directions[blank]:
+                    (child, _) = packed.move(state, blank, cell)
+                    if child not in depth:
+                        depth[child] = depth[state] + 1
+                        following.append((child, cell))
+                        # an optimal move of child takes the blank back where it comes from
+                        direction = oracle.direction(cell, blank)
+                        oracle.table[oracle.index(child)] = depth[child] | (
+                            direction << DISTANCE_BITS
+                        )
+            frontier = following
+        oracle.table = bytes(oracle.table)
+        return oracle
+
+    @classmethod
+    def loadOrBuild(cls, folder=FOLDER):
+        """
+        Load the oracle from the folder, build and save it if it is missing.
+
+        :param folder: The folder of the precomputed tables.
+        :return:       The Oracle.
+        """
+        path = cls.fileName(folder)
+        if os.path.isfile(path):
+            with open(path, "rb") as f:
+                return cls(f.read())
+        start = time.time()
+        oracle = cls.build()
+        print(f"Oracle built in {time.time() - start:.2f}s, {SIZE} bytes")
+        os.makedirs(folder, exist_ok=True)
+        with open(path, "wb") as f:
+            f.write(oracle.table)
+        return oracle
+
+    def direction(self, source, target):
+        """
+        :return: The direction of the move of the blank from the cell source to target.
+        """
+        for (direction, cell) in self.directions[source]:
+            if cell == target:
+                return direction
+
+    def index(self, state):
+        """
+        :return: The index of a packed state in the table.
+        """
+        tiles = []
+        blank = 0
+        for cell in range(9):
+            tile = (state >> (4 * cell)) & 15
+            if tile == 8:
+                blank = cell
+            else:
+                tiles.append(tile)
+        rank = 0
+        for i in range(8):
+            smaller = 0
+            for j in range(i + 1, 8):
+                if tiles[j] < tiles[i]:
+                    smaller += 1
+            rank = rank * (8 - i) + smaller
+        return blank * PERMUTATIONS + rank // 2
+
+    def distance(self, state):
+        """
+        :return: The number of moves of an optimal solution of a packed state.
+        """
+        return self.table[self.index(state)] & ((1 << DISTANCE_BITS) - 1)
+
+    def bestMove(self, state):
+        """
+        :return: The direction of the blank of an optimal move from a packed state,
+                 None for the goal.
+        """
+        if state == self.packed.goal:
+            return None
+        return self.table[self.index(state)] >> DISTANCE_BITS
+
+    def optimalMoves(self, state):
+        """
+        :return: The directions of all the optimal moves of the blank from a packed state.
+        """
+        distance = self.distance(state)
+        blank = self.packed.blankCell(state)
+        return [
+            direction
+            for (direction, cell) in self.directions[blank]
+            if self.distance(self.packed.move(state, blank, cell)[0]) == distance - 1
+        ]
+
+    def solve(self, state):
+        """
+        Follow the optimal moves from a packed state.
+
+        :param state: The packed state, an Int.
+        :return:      The list of the states from state to the goal.
+        """
+        if not self.packed.isSolvable(state):
+            return None
+        path = [state]
+        blank = self.packed.blankCell(state)
+        while state != self.packed.goal:
+            (dx, dy) = DIRECTIONS[self.bestMove(state)]
+            cell = blank + dx + 3 * dy
+            (state, _) = self.packed.move(state, blank, cell)
+            blank = cell
+            path.append(state)
+        return path
+
+
+def stringToState(string):
+    """
+    Pack a state of AIPlayer, a permutation of "123456789" giving the tile of each cell
+    ("9" for the blank).
+    """
+    return sum((int(char) - 1) << (4 * cell) for cell, char in enumerate(string))
+
+
+def stateToString(state):
+    """
+    Give the AIPlayer string of a packed state.
+    """
+    return "".join(str(((state >> (4 * cell)) & 15) + 1) for cell in range(9))
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Build the table of the optimal solutions of the 8 puzzle."
+    )
+    parser.parse_args()
+    oracle = Oracle.loadOrBuild()
+    counts = {}
+    for value in oracle.table:
+        distance = value & ((1 << DISTANCE_BITS) - 1)
+        counts[distance] = counts.get(distance, 0) + 1
+    for distance in sorted(counts):
+        print(f"{distance} moves: {counts[distance]} states")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+BITS = 4
+MASK = (1 << BITS) - 1
+
+
+class PackedPuzzle:
+    """
+    Puzzle states packed in one integer, used by the solvers instead of the lists of
+    positions of SlidePuzzle. The cell (x, y) is numbered x + width * y and holds BITS
+    bits at offset BITS * cell: the number of the tile placed on it, the blank being
+    the last tile. The tables of the moves of the blank are computed once per grid size.
+    """
+
+    def __init__(self, gs=(3, 3)):
+        """
+        Init the tables.
+
+        :param gs: The grid size. It is a tuple (n,m) of Int, n * m must not exceed 16.
+        """
+        self.gs = gs
+        self.size = gs[0] * gs[1]
+        if self.size > 1 << BITS:
+            raise ValueError(f"Grid {gs} too large for {BITS} bits per tile")
+        self.blank = self.size - 1
+        # In the winning configuration, cell i holds tile i.
+        self.goal = sum(tile << (BITS * tile) for tile in range(self.size))
+
+        # moves[cell] is the tuple of the cells the blank can go to from cell.
+        self.moves = []
+        for cell in range(self.size):
+            x, y = self.position(cell)
+            self.moves.append(
+                tuple(
+                    nx + gs[0] * ny
+                    for (nx, ny) in ((x - 1, y), (x + 1, y), (x, y - 1), (x, y + 1))
+                    if 0 <= nx < gs[0] and 0 <= ny < gs[1]
+                )
+            )
+        # manhattan[tile][cell] is the Manhattan distance of tile on cell to its goal cell,
+        # 0 for the blank.
+        self.manhattan = [
+            [
+                0
+                if tile == self.blank
+                else abs(self.position(cell)[0] - self.position(tile)[0])
+                + abs(self.position(cell)[1] - self.position(tile)[1])
+                for cell in range(self.size)
+            ]
+            for tile in range(self.size)
+        ]
+
+    def position(self, cell):
+        """
+        Give the position of a cell.
+
+        :param cell: The cell number, an Int.
+        :return:     The position (x, y) of the cell.
+        """
+        return cell % self.gs[0], cell // self.gs[0]
+
+    def encode(self, tiles):
+        """
+        Pack a configuration of SlidePuzzle.
+
+        :param tiles: The position (x, y) of each tile, the blank being the last one.
+        :return:      The packed state, an Int.
+        """
+        return sum(
+            tile << (BITS * (x + self.gs[0] * y)) for tile, (x, y) in enumerate(tiles)
+        )
+
+    def decode(self, state):
+        """
+        Unpack a state into a configuration of SlidePuzzle.
+
+        :param state: The packed state, an Int.
+        :return:      The position (x, y) of each tile, the blank being the last one.
+        """
+        tiles = [None] * self.size
+        for cell in range(self.size):
+            tiles[self.tile(state, cell)] = self.position(cell)
+        return tiles
+
+    def tile(self, state, cell):
+        """
+        :return: The tile on a cell of the state.
+        """
+        return (state >> (BITS * cell)) & MASK
+
+    def blankCell(self, state):
+        """
+        :return: The cell of the blank in the state.
+        """
+        for cell in range(self.size):
+            if (state >> (BITS * cell)) & MASK == self.blank:
+                return cell
+
+    def move(self, state, blank, cell):
+        """
+        Slide the tile of cell into the blank.
+
+        :param state: The packed state, an Int.
+        :param blank: The cell of the blank in state.
+        :param cell:  A cell adjacent to the blank.
+        :return:      The new state and the tile that moved.
+        """
+        tile = (state >> (BITS * cell)) & MASK
+        # both cells hold either tile or the blank, swap them with the same mask
+        swap = tile ^ self.blank
+        return state ^ (swap << (BITS * cell)) ^ (swap << (BITS * blank)), tile
+
+    def distance(self, state):
+        """
+        :return: The sum of the Manhattan distances of the tiles of the state.
+        """
+        return sum(
+            self.manhattan[self.tile(state, cell)][cell] for cell in range(self.size)
+        )
+
+    def isSolvable(self, state):
+        """
+        A state can reach the goal when the parity of its permutation of the cells is
+        the parity of the distance between the blank and its goal cell, each move being
+        a transposition that moves the blank by one cell.
+
+        :param state: The packed state, an Int.
+        :return:      True if the goal can be reached, otherwise False.
+        """
+        tiles = [self.tile(state, cell) for cell in range(self.size)]
+        inversions = 0
+        for i in range(self.size):
+            for j in range(i + 1, self.size):
+                if tiles[i] > tiles[j]:
+                    inversions += 1
+        (x, y) = self.position(tiles.index(self.blank))
+        (gx, gy) = self.position(self.blank)
+        return inversions % 2 == (abs(x - gx) + abs(y - gy)) % 2
+
+    def random(self, rng):
+        """
+        Draw a solvable state uniformly.
+
+        :param rng: A random.Random instance.
+        :return:    The packed state, an Int.
+        """
+        tiles = list(range(self.size))
+        rng.shuffle(tiles)
+        state = sum(tile << (BITS * cell) for cell, tile in enumerate(tiles))
+        if not self.isSolvable(state):
+            # exchanging two tiles other than the blank changes the parity
+            (a, b) = [cell for cell in range(self.size) if tiles[cell] != self.blank][:2]
+            (tiles[a], tiles[b]) = (tiles[b], tiles[a])
+            state = sum(tile << (BITS * cell) for cell, tile in enumerate(tiles))
+        return state
@@ -0,0 +1,246 @@
+import argparse
+import multiprocessing
+import os
+import time
+
+import numpy as np
+
+from BatchTrainer import PRETRAIN_LEVELS, BatchTrainer, report
+import QTableFile
+from StateEngine import getEngine
+
+MERGES = ["mean", "max"]
+
+# Q-Tables of a worker process: the shared Q-Table and the local table of each worker
+_tables = {}
+
+
+def _sharedTable(buffer, count=None):
+    shape = (QTableFile.STATES, QTableFile.ACTIONS)
+    if count is not None:
+        shape = (count,) + shape
+    return np.frombuffer(buffer, dtype=np.float32).reshape(shape)
+
+
+def _initWorker(sharedBuffer, localBuffer, workers):
+    _tables["shared"] = _sharedTable(sharedBuffer)
+    _tables["local"] = _sharedTable(localBuffer, workers)
+    getEngine()
+
+
+def _trainShard(task):
+    """
+    Train the local table of a worker, copied from the shared Q-Table, on its shard of games.
+
+    :param task:    The tuple (worker, level, nbGames, batchSize, parameters, seed), level
+                    being the pre-learning level of the games or None for random games.
+    :return:        The number of played episodes and of moves.
+    """
+    (worker, level, nbGames, batchSize, parameters, seed) = task
+    local = _tables["local"][worker]
+    local[:] = _tables["shared"]
+    trainer = BatchTrainer(local, seed=seed, **parameters)
+    if level is None:
+        episodes = trainer.train(nbGames, batchSize)
+    else:
+        episodes = trainer.initLearning(level, nbGames)
+    return episodes, trainer.nbMoves
+
+
+class ParallelTrainer:
+    """
+    Q-learning of the 8 puzzle with a pool of worker processes. Each round, the workers
+    copy the shared Q-Table, train their copy with a BatchTrainer on their own shard of
+    games, then the copies are merged into the shared Q-Table by their mean or their
+    maximum. The tables are in shared memory, they are not sent between the processes.
+    """
+
+    def __init__(self, qTable, meta, workers=None, merge="mean", seed=None):
+        """
+        :param qTable:  The (9!, 4) float32 array, updated at the end of the training.
+        :param meta:    The dictionary of the parameters of the AIPlayer.
+        :param workers: The number of worker processes, default is the number of cores.
+        :param merge:   "mean" or "max", how the tables of the workers are merged.
+        :param seed:    The seed of the random generators of the workers.
+        """
+        if merge not in MERGES:
+            raise ValueError(f"merge must be one of {MERGES}")
+        self.qTable = qTable
+        self.meta = dict(meta)
+        self.workers = workers or os.cpu_count()
+        self.merge = merge
+        self.seed = seed
+        self.rounds = 0
+        self.nbMoves = 0
+
+        size = QTableFile.STATES * QTableFile.ACTIONS
+        sharedBuffer = multiprocessing.RawArray("f", size)
+        localBuffer = multiprocessing.RawArray("f", size * self.workers)
+        self.shared = _sharedTable(sharedBuffer)
+        self.local = _sharedTable(localBuffer, self.workers)
+        self.shared[:] = qTable
+        # built before the workers are started, so that forked workers share it
+        getEngine()
+        self.pool = multiprocessing.Pool(
+            self.workers, _initWorker, (sharedBuffer, localBuffer, self.workers)
+        )
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        """
+        Stop the workers and copy the shared Q-Table into qTable.
+        """
+        self.pool.close()
+        self.pool.join()
+        self.qTable[:] = self.shared
+
+    def _round(self, level, nbGames, batchSize=4096):
+        """
+        Split nbGames between the workers, train them and merge their tables.
+
+        :return: The number of played episodes.
+        """
+        tasks = []
+        for worker in range(self.workers):
+            share = nbGames // self.workers + (worker < nbGames % self.workers)
+            seed = None
+            if self.seed is not None:
+                seed = (self.seed, self.rounds, worker)
+            tasks.append((worker, level, share, batchSize, self.meta, seed))
+        results = self.pool.map(_trainShard, tasks)
+        if self.merge == "mean":
+            np.mean(self.local, axis=0, out=self.shared)
+        else:
+            np.max(self.local, axis=0, out=self.shared)
+        self.rounds += 1
+        self.nbMoves += sum(moves for (_, moves) in results)
+        return sum(episodes for (episodes, _) in results)
+
+    def preTrain(self, nbGames=100, progress=None):
+        """
+        Parallel version of BatchTrainer.preTrain, the tables are merged after each level.
+
+        :return: The number of played episodes.
+        """
+        episodes = 0
+        for level in range(PRETRAIN_LEVELS):
+            episodes += self._round(level + 1, nbGames)
+            if progress is not None:
+                progress((level + 1) / PRETRAIN_LEVELS)
+        return episodes
+
+    def train(self, nbGames, interval=20000, batchSize=4096):
+        """
+        Parallel version of BatchTrainer.train, the tables are merged every interval games.
+
+        :return: The number of played episodes.
+        """
+        played = 0
+        while played < nbGames:
+            size = min(interval, nbGames - played)
+            self._round(None, size, batchSize)
+            self.meta["nbPlayedGames"] += size
+            played += size
+        return played
+
+
+def scaling(qTable, meta, maxWorkers, args):
+    """
+    Train copies of qTable with 1 to maxWorkers processes and print the speedups.
+    """
+    rates = {}
+    for workers in range(1, maxWorkers + 1):
+        with ParallelTrainer(
+            qTable.copy(), meta, workers, args.merge, args.seed
+        ) as trainer:
+            start = time.time()
+            episodes = trainer.preTrain(args.pretrain) if args.pretrain > 0 else 0
+            episodes += trainer.train(args.games, args.interval, args.batch)
+            elapsed = time.time() - start
+        rates[workers] = episodes / elapsed if elapsed > 0 else 0
+        speedup = rates[workers] / rates[1] if rates[1] > 0 else float("nan")
+        print(
+            f"{workers} workers: {episodes} episodes in {elapsed:.2f}s,",
+            f"{rates[workers]:.0f} episodes/s, speedup {speedup:.2f}",
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Train a Q-Table of the 8 puzzle with several processes."
+    )
+    parser.add_argument(
+        "model", type=str, help="The .npy Q-Table, created if it does not exist."
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        help="Number of worker processes, default is the number of cores.",
+        default=os.cpu_count(),
+    )
+    parser.add_argument(
+        "--merge",
+        choices=MERGES,
+        help="Merge of the tables of the workers: their mean or their maximum.",
+        default="mean",
+    )
+    parser.add_argument(
+        "--pretrain",
+        type=int,
+        help="Number of pre-learning games of each level, 0 for none.",
+        default=0,
+    )
+    parser.add_argument(
+        "--games", type=int, help="Number of random training games.", default=0
+    )
+    parser.add_argument(
+        "--interval",
+        type=int,
+        help="Number of games between two merges of the tables.",
+        default=20000,
+    )
+    parser.add_argument(
+        "--batch", type=int, help="Number of episodes played at once.", default=4096
+    )
+    parser.add_argument(
+        "--scaling",
+        action="store_true",
+        help="Compare 1 to WORKERS processes on the same training, the model is not saved.",
+    )
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    path = QTableFile.npyPath(args.model)
+    if os.path.isfile(path):
+        (qTable, meta) = QTableFile.loadQTable(path)
+    else:
+        (qTable, meta) = (QTableFile.emptyQTable(), dict(QTableFile.DEFAULT_META))
+
+    if args.scaling:
+        if args.pretrain <= 0 and args.games <= 0:
+            parser.error("--scaling needs --pretrain or --games")
+        scaling(qTable, meta, args.workers, args)
+        return
+
+    with ParallelTrainer(qTable, meta, args.workers, args.merge, args.seed) as trainer:
+        if args.pretrain > 0:
+            start = time.time()
+            episodes = trainer.preTrain(args.pretrain)
+            report("Pre-learning", episodes, trainer.nbMoves, time.time() - start)
+        if args.games > 0:
+            trainer.nbMoves = 0
+            start = time.time()
+            episodes = trainer.train(args.games, args.interval, args.batch)
+            report("Training", episodes, trainer.nbMoves, time.time() - start)
+
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    QTableFile.saveQTable(path, qTable, trainer.meta)
+
+
+if __name__ == "__main__":
+    main()
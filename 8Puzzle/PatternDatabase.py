@@ -0,0 +1,169 @@
+import argparse
+import os
+import time
+
+import numpy as np
+
+from PackedPuzzle import PackedPuzzle
+
+# Folder where the pattern databases are saved, next to the QTable folder
+FOLDER = "PatternDB"
+
+# Disjoint patterns used by default, tile i belonging on cell i (the blank is never part
+# of a pattern). 4-4 for the 8 puzzle and 5-5-5 for the 15 puzzle.
+DEFAULT_PATTERNS = {
+    (3, 3): [(0, 1, 2, 3), (4, 5, 6, 7)],
+    (4, 4): [(0, 1, 2, 4, 5), (3, 6, 7, 10, 11), (8, 9, 12, 13, 14)],
+}
+
+UNKNOWN = 255
+
+
+def defaultPatterns(gs):
+    """
+    Give the default partition of the tiles of a grid into patterns.
+
+    :param gs: The grid size, a tuple (n,m) of Int.
+    :return:   A list of tuples of tiles.
+    """
+    if gs in DEFAULT_PATTERNS:
+        return DEFAULT_PATTERNS[gs]
+    tiles = list(range(gs[0] * gs[1] - 1))
+    return [tuple(tiles[i : i + 5]) for i in range(0, len(tiles), 5)]
+
+
+class PatternDatabase:
+    """
+    Number of moves of the tiles of a pattern needed to bring them home, for every
+    placement of these tiles, the other tiles being indistinguishable. The moves of the
+    other tiles are free, so the databases of disjoint patterns can be added.
+
+    A placement is indexed by sum(cell of pattern[i] * size ** i), the table is a byte
+    array of size ** len(pattern) entries (the entries where two tiles share a cell are
+    not used) so that a move of one tile only changes the index by a difference.
+    """
+
+    def __init__(self, packed, pattern, table):
+        self.packed = packed
+        self.pattern = tuple(pattern)
+        self.table = table
+        self.powers = [packed.size ** i for i in range(len(self.pattern))]
+
+    @classmethod
+    def build(cls, packed, pattern):
+        """
+        Backward breadth first search from the goal over the placements of the pattern
+        and of the blank, moves of a pattern tile costing 1 and the others 0. Each level
+        is completed with the free moves before the moves of cost 1 are followed.
+        The search works on whole frontiers with numpy.
+
+        :param packed:  The PackedPuzzle of the grid.
+        :param pattern: The tiles of the pattern, a tuple of Int.
+        :return:        The PatternDatabase.
+        """
+        n = packed.size
+        k = len(pattern)
+        powers = n ** np.arange(k, dtype=np.int64)
+        # neighbors[cell] are the cells the blank can go to from cell, -1 for none
+        neighbors = np.full((n, 4), -1, dtype=np.int64)
+        for cell, moves in enumerate(packed.moves):
+            neighbors[cell, : len(moves)] = moves
+
+        # the state (placement index, blank cell) is numbered index * n + blank
+        distances = np.full(n ** k * n, UNKNOWN, dtype=np.uint8)
+        goal = int(sum(tile * n ** i for i, tile in enumerate(pattern)))
+        blanks = [cell for cell in range(n) if cell not in pattern]
+        frontier = np.array(blanks, dtype=np.int64) + goal * n
+        distances[frontier] = 0
+        depth = 0
+
+        def expand(states):
+            index = states // n
+            blank = states % n
+            cells = (index[:, None] // powers) % n
+            free = []
+            costly = []
+            for direction in range(4):
+                target = neighbors[blank, direction]
+                valid = target >= 0
+                occupied = cells == target[:, None]
+                hit = occupied.any(axis=1)
+                free.append((index * n + target)[valid & ~hit])
+                # the pattern tile on target slides to the former cell of the blank
+                slot = occupied.argmax(axis=1)
+                moved = index + (blank - target) * powers[slot]
+                costly.append((moved * n + target)[valid & hit])
+            return np.concatenate(free), np.concatenate(costly)
+
+        while frontier.size != 0:
+            level = [frontier]
+            new = frontier
+            while new.size != 0:
+                (free, _) = expand(new)
+                new = np.unique(free[distances[free] == UNKNOWN])
+                distances[new] = depth
+                level.append(new)
+            (_, costly) = expand(np.concatenate(level))
+            frontier = np.unique(costly[distances[costly] == UNKNOWN])
+            depth += 1
+            distances[frontier] = depth
+
+        table = distances.reshape(n ** k, n).min(axis=1)
+        return cls(packed, pattern, table)
+
+    @staticmethod
+    def fileName(gs, pattern, folder=FOLDER):
+        """
+        :return: The file of the database of a pattern for the grid size gs.
+        """
+        name = "-".join(str(tile) for tile in pattern)
+        return os.path.join(folder, f"pdb_{gs[0]}x{gs[1]}_{name}.npy")
+
+    @classmethod
+    def loadOrBuild(cls, packed, pattern, folder=FOLDER):
+        """
+        Load the database of a pattern from the folder, build and save it if it is missing.
+
+        :param packed:  The PackedPuzzle of the grid.
+        :param pattern: The tiles of the pattern, a tuple of Int.
+        :param folder:  The folder of the databases.
+        :return:        The PatternDatabase.
+        """
+        path = cls.fileName(packed.gs, pattern, folder)
+        if os.path.isfile(path):
+            return cls(packed, pattern, np.load(path, mmap_mode="r"))
+        start = time.time()
+        database = cls.build(packed, pattern)
+        print(
+            f"Pattern database {pattern} built in {time.time() - start:.2f}s,",
+            f"{database.table.nbytes} bytes",
+        )
+        os.makedirs(folder, exist_ok=True)
+        np.save(path, database.table)
+        return database
+
+    def index(self, state):
+        """
+        :return: The index of the placement of the pattern tiles in a packed state.
+        """
+        cells = {}
+        for cell in range(self.packed.size):
+            cells[self.packed.tile(state, cell)] = cell
+        return sum(cells[tile] * power for tile, power in zip(self.pattern, self.powers))
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Build the pattern databases of the sliding puzzle."
+    )
+    parser.add_argument(
+        "--size", type=int, help="Width and height of the grid.", default=3
+    )
+    args = parser.parse_args()
+    packed = PackedPuzzle((args.size, args.size))
+    for pattern in defaultPatterns(packed.gs):
+        PatternDatabase.loadOrBuild(packed, pattern)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+import argparse
+import glob
+import json
+import math
+import os
+
+import numpy as np
+
+# Number of states (permutations of "123456789") and of actions of the Q-Table
+STATES = math.factorial(9)
+ACTIONS = 4
+
+# Parameters of the AIPlayer saved with its Q-Table
+DEFAULT_META = {"nbPlayedGames": 1, "epsilon": 0.5, "gamma": 0.4, "learningSteps": 60000}
+
+
+def metaPath(path):
+    """
+    :return: The path of the JSON file holding the parameters of the Q-Table at path.
+    """
+    return os.path.splitext(path)[0] + ".json"
+
+
+def npyPath(path):
+    """
+    :return: The path of the .npy Q-Table corresponding to path (.txt or .npy).
+    """
+    return os.path.splitext(path)[0] + ".npy"
+
+
+def emptyQTable():
+    """
+    :return: A new Q-Table filled with zeros, a (9!, 4) float32 array.
+    """
+    return np.zeros((STATES, ACTIONS), dtype=np.float32)
+
+
+def saveQTable(path, qTable, meta):
+    """
+    Save a Q-Table in the .npy file at path and its parameters in the JSON file next to it.
+    The file is written next to path then renamed, so that a Q-Table memory mapped from
+    path keeps reading the former file while it is replaced.
+
+    :param path:    A string corresponding to the path of the .npy file.
+    :param qTable:  The (9!, 4) float32 array.
+    :param meta:    A dictionary of the parameters of the AIPlayer.
+    """
+    temporary = path + ".tmp"
+    with open(temporary, "wb") as f:
+        np.save(f, qTable)
+    os.replace(temporary, path)
+    with open(metaPath(path), "w") as f:
+        json.dump(meta, f)
+
+
+def loadQTable(path):
+    """
+    Open the Q-Table of the .npy file at path as a copy-on-write memory map and read its
+    parameters: loading is immediate and the updates stay in memory, the file only
+    changes when the Q-Table is saved with saveQTable.
+
+    :param path:    A string corresponding to the path of the .npy file.
+    :return:        The Q-Table and the dictionary of its parameters.
+    """
+    qTable = np.load(path, mmap_mode="c")
+    meta = dict(DEFAULT_META)
+    if os.path.isfile(metaPath(path)):
+        with open(metaPath(path), "r") as f:
+            meta.update(json.load(f))
+    return qTable, meta
+
+
+def importText(path):
+    """
+    Convert a Q-Table saved in the text format (4 header lines then one line of 4 values
+    per state) into a .npy file and its JSON parameters next to it.
+
+    :param path:    A string corresponding to the path of the .txt file.
+    :return:        The path of the .npy file.
+    """
+    with open(path, "r") as f:
+        meta = {
+            "nbPlayedGames": int(f.readline().strip()),
+            "epsilon": float(f.readline().strip()),
+            "gamma": float(f.readline().strip()),
+            "learningSteps": int(f.readline().strip()),
+        }
+        qTable = np.loadtxt(f, dtype=np.float32, max_rows=STATES, ndmin=2)
+    if qTable.shape != (STATES, ACTIONS):
+        raise ValueError(f"{path}: expected {STATES} lines of {ACTIONS} values")
+    destination = npyPath(path)
+    saveQTable(destination, qTable, meta)
+    return destination
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Convert the Q-Tables saved as text files into .npy files."
+    )
+    parser.add_argument(
+        "files",
+        nargs="*",
+        help="Text Q-Tables to convert, default is every QTable/*.txt file.",
+    )
+    args = parser.parse_args()
+    for path in args.files or sorted(glob.glob(os.path.join("QTable", "*.txt"))):
+        print(path, "->", importText(path))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+import itertools
+import math
+
+import numpy as np
+
+# Number of cells, the states are the permutations of "123456789", "9" being the blank
+CELLS = 9
+STATES = math.factorial(CELLS)
+
+# Number of bits set in each 9 bit mask
+POPCOUNT = [bin(mask).count("1") for mask in range(1 << CELLS)]
+
+FACTORIALS = [math.factorial(CELLS - 1 - i) for i in range(CELLS)]
+
+# Moves of the blank in the order of the actions of AIPlayer: UP, RIGHT, DOWN, LEFT
+ACTIONS = [(0, -1), (1, 0), (0, 1), (-1, 0)]
+
+
+def rankPermutation(values):
+    """
+    Rank of a permutation of 0..8 in the lexicographical order, in O(n): the number of
+    unused values smaller than values[i] is values[i] minus the used ones, counted with
+    a bit mask of the used values.
+
+    :param values:  A sequence of the 9 integers 0..8.
+    :return:        An integer between 0 and 9! - 1.
+    """
+    rank = 0
+    used = 0
+    for i in range(CELLS):
+        value = values[i]
+        rank += (value - POPCOUNT[used & ((1 << value) - 1)]) * FACTORIALS[i]
+        used |= 1 << value
+    return rank
+
+
+def unrankPermutation(rank):
+    """
+    :param rank:    An integer between 0 and 9! - 1.
+    :return:        The list of the permutation of 0..8 of that rank.
+    """
+    remaining = list(range(CELLS))
+    values = []
+    for i in range(CELLS):
+        (index, rank) = divmod(rank, FACTORIALS[i])
+        values.append(remaining.pop(index))
+    return values
+
+
+class StateEngine:
+    """
+    States of the 8 puzzle as integer ranks, rank 0 being "123456789" (the goal), with
+    the precomputed transitions of the 4 actions so that playing a move is an array lookup.
+
+    nextState[rank, action] is the rank of the state reached by moving the blank in the
+    direction action, the state itself if the move leaves the grid (as AIPlayer.makeMove).
+    isGoal[rank] is True for the goal only and reachable[rank] for the states from which
+    the goal can be reached.
+    """
+
+    def __init__(self):
+        # permutations gives the lexicographical order of the sorted input
+        self.states = np.array(
+            list(itertools.permutations(range(CELLS))), dtype=np.int8
+        )
+        self.goal = 0
+        self.isGoal = np.zeros(STATES, dtype=bool)
+        self.isGoal[self.goal] = True
+
+        rows = np.arange(STATES)
+        blank = np.argmax(self.states == CELLS - 1, axis=1)
+        (x, y) = (blank % 3, blank // 3)
+        self.nextState = np.empty((STATES, len(ACTIONS)), dtype=np.int32)
+        for action, (dx, dy) in enumerate(ACTIONS):
+            valid = (x + dx >= 0) & (x + dx < 3) & (y + dy >= 0) & (y + dy < 3)
+            target = np.where(valid, blank + dx + 3 * dy, blank)
+            moved = self.states.copy()
+            moved[rows, blank] = self.states[rows, target]
+            moved[rows, target] = CELLS - 1
+            self.nextState[:, action] = self.rankStates(moved)
+
+        # backward breadth first search from the goal, the moves are reversible
+        self.reachable = np.zeros(STATES, dtype=bool)
+        self.reachable[self.goal] = True
+        frontier = np.array([self.goal])
+        while frontier.size != 0:
+            following = np.unique(self.nextState[frontier].ravel())
+            frontier = following[~self.reachable[following]]
+            self.reachable[frontier] = True
+
+    @staticmethod
+    def rankStates(states):
+        """
+        Vectorized rankPermutation of the rows of an (n, 9) array.
+        """
+        ranks = np.zeros(len(states), dtype=np.int64)
+        for i in range(CELLS):
+            smaller = (states[:, i + 1 :] < states[:, i : i + 1]).sum(axis=1)
+            ranks += smaller * FACTORIALS[i]
+        return ranks
+
+    def rankOf(self, string):
+        """
+        :param string:  A string corresponding to a state of the game.
+        :return:        The rank of the state.
+        """
+        return rankPermutation([ord(char) - ord("1") for char in string])
+
+    def stringOf(self, rank):
+        """
+        :param rank:    The rank of a state.
+        :return:        The string corresponding to the state.
+        """
+        return "".join(chr(ord("1") + value) for value in self.states[rank])
+
+
+_engine = None
+
+
+def getEngine():
+    """
+    :return: The StateEngine shared by the AI players, built on first use.
+    """
+    global _engine
+    if _engine is None:
+        _engine = StateEngine()
+    return _engine
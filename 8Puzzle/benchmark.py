@@ -0,0 +1,111 @@
+from EightPuzzle_astar import SEARCHES, astar, idastar, oracle
+from Heuristics import HEURISTICS, makeHeuristic
+from Oracle import Oracle
+from PackedPuzzle import PackedPuzzle
+import argparse
+import csv
+import random
+
+FIELDS = [
+    "instance",
+    "search",
+    "heuristic",
+    "length",
+    "optimal",
+    "expanded",
+    "stored",
+    "time",
+    "nodes_per_second",
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark of the sliding puzzle solvers on random instances."
+    )
+    parser.add_argument(
+        "--size", type=int, help="Width and height of the grid.", default=3
+    )
+    parser.add_argument(
+        "--instances", type=int, help="Number of random instances.", default=10
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--searches", nargs="+", choices=SEARCHES, default=SEARCHES
+    )
+    parser.add_argument(
+        "--heuristics", nargs="+", choices=HEURISTICS, default=["pdb"]
+    )
+    parser.add_argument(
+        "--table",
+        type=int,
+        help="Number of entries of the transposition table of IDA*, 0 for none.",
+        default=0,
+    )
+    parser.add_argument(
+        "--output", type=str, help="CSV file of the results.", default=None
+    )
+    args = parser.parse_args()
+
+    packed = PackedPuzzle((args.size, args.size))
+    rng = random.Random(args.seed)
+    instances = [packed.random(rng) for _ in range(args.instances)]
+    heuristics = {name: makeHeuristic(name, packed) for name in args.heuristics}
+    # the optimal lengths of the 3x3 instances are checked with the oracle
+    table = Oracle.loadOrBuild() if args.size == 3 else None
+    searches = [s for s in args.searches if s != "oracle" or table is not None]
+
+    results = []
+    for number, state in enumerate(instances):
+        for search in searches:
+            for name, heuristic in heuristics.items():
+                stats = {}
+                if search == "oracle":
+                    # the oracle does not use the heuristic
+                    if name != args.heuristics[0]:
+                        continue
+                    name = "-"
+                    path = oracle(state, stats)
+                elif search == "idastar":
+                    path = idastar(packed, state, heuristic, args.table, stats)
+                else:
+                    path = astar(packed, state, heuristic, stats)
+                result = dict(
+                    instance=number,
+                    search=search,
+                    heuristic=name,
+                    length=len(path) - 1,
+                    optimal=None if table is None else table.distance(state),
+                    expanded=stats["expanded"],
+                    stored=stats["stored"],
+                    time=round(stats["time"], 4),
+                    nodes_per_second=round(stats["nodes_per_second"]),
+                )
+                if result["optimal"] not in (None, result["length"]):
+                    print(f"#{number} {search} {name}: not optimal")
+                print(
+                    f"#{number} {search} {name}: {result['length']} moves,",
+                    f"{result['expanded']} nodes expanded in {stats['time']:.3f}s,",
+                    f"{result['nodes_per_second']} nodes/s",
+                )
+                results.append(result)
+
+    for search in searches:
+        for name in ["-"] if search == "oracle" else heuristics:
+            runs = [r for r in results if r["search"] == search and r["heuristic"] == name]
+            expanded = sum(r["expanded"] for r in runs)
+            elapsed = sum(r["time"] for r in runs)
+            print(
+                f"{search} {name}: {expanded} nodes expanded in {elapsed:.2f}s,",
+                f"{expanded / elapsed if elapsed > 0 else 0:.0f} nodes/s",
+            )
+
+    if args.output is not None:
+        with open(args.output, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=FIELDS)
+            writer.writeheader()
+            writer.writerows(results)
+
+
+if __name__ == "__main__":
+    main()
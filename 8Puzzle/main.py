@@ -1,8 +1,9 @@
 import pygame
 from Game_UI import WIDTH, HEIGHT, SlidePuzzle
 import os
-from EightPuzzle_astar import playAIGame
+from EightPuzzle_astar import SEARCHES, playAIGame
 from EightPuzzle_RL import initPlayerAI
+from Heuristics import HEURISTICS
 import argparse
 import sys
 
@@ -19,6 +20,24 @@ def main():
     parser.add_argument(
         "-r", "--rl", action="store_true", help="Start the program in RL mode."
     )
+    parser.add_argument(
+        "--heuristic",
+        choices=HEURISTICS,
+        default="manhattan",
+        help="Heuristic of the A* search: Manhattan distance, Manhattan distance with linear conflicts or additive pattern databases (built in PatternDB on first use).",
+    )
+    parser.add_argument(
+        "--search",
+        choices=SEARCHES,
+        default="astar",
+        help="Search of the A* mode: A*, IDA* whose memory is linear in the depth, or the table of the optimal moves of the 3x3 grid.",
+    )
+    parser.add_argument(
+        "--table",
+        type=int,
+        default=0,
+        help="Number of entries of the transposition table of IDA*, 0 for none.",
+    )
     args = parser.parse_args()
     pygame.init()
     os.environ["SDL_VIDEO_CENTERED"] = "1"
@@ -42,7 +61,7 @@ def main():
 
         if choice == "AI" and args.astar:
             puzzle.shuffle()
-            playAIGame(puzzle, fpsclock)
+            playAIGame(puzzle, fpsclock, args.heuristic, args.search, args.table)
         elif choice == "AI" and args.rl:
             modelAI = puzzle.selectModel()
             if modelAI != "":
@@ -1,12 +1,21 @@
 from FileHandler import FileHandler
 from GUI import GUI
+from History import History
+from Landmarks import Landmarks
+from ContractionHierarchy import ContractionHierarchy
+from LPAStar import LPAStar
+from SpatialIndex import GridIndex
+from PriorityQueue import make_queue
+from DistanceTable import DistanceTable
 
 import heapq
 import time
 from enum import Enum
 
 import networkx as nx
+import numpy as np
 import copy
+import functools
 
 
 class Heuristic(str, Enum):
@@ -14,10 +23,20 @@ class Heuristic(str, Enum):
     EUCLIDIAN = "Euclidian"
     CHEBYSHEV = "Chebyshev"
     DIJKSTRA = "Dijkstra"
+    LANDMARKS = "Landmarks"
+    EXACT = "Exact"
 
 
 HEURISTICS = [e.value for e in Heuristic]
 
+# Vectorized geometric heuristics,
+# dx and dy are the coordinate differences with the goal
+GEOMETRIC_HEURISTICS = {
+    Heuristic.MANHATTAN: lambda dx, dy: (dx + dy) / 2,
+    Heuristic.EUCLIDIAN: lambda dx, dy: np.sqrt(dx ** 2 + dy ** 2),
+    Heuristic.CHEBYSHEV: lambda dx, dy: np.maximum(dx, dy),
+}
+
 
 class Algorithm:
     """
@@ -30,48 +49,204 @@ class Algorithm:
         heuristic,
         is_bidirectional,
         logger,
+        backend="networkx",
+        parent_pointers=False,
+        record="full",
+        record_every=10,
+        record_budget=1000000,
+        bidirectional_mode="first",
+        landmarks=8,
+        engine="astar",
+        start=0,
+        goal=1,
+        corridor=None,
+        queue="binary",
+        processes=1,
+        instrumentation=None,
     ):
         fh = FileHandler(instance)
-        (
-            self.E,
-            self.V,
-            self.vertices,
-            self.edges,
-            self.edge_index,
-            self.nodes,
-        ) = fh.read()
-        # E is total number of edges
-        # V is total number of vertices/nodes
-        # vertices is a dictionary that contain vertex id as key and a tuple (position x, position y) as value
-        # edges is a list of tuples (source, destination, weight, color)
-        # edge_index is a dictionary that stores the index of each edges in the list above
-        # nodes is a dictionary where we can get direct neighbors of each nodes and the color assigned to each node
-        logger.debug("Instance loaded")
-        logger.debug(f"{self.V} nodes = {self.vertices}")
-        logger.debug(f"{self.E} edges = {self.edges}")
-        logger.debug(f"Edges index = {self.edge_index}")
-        logger.debug(f"Nodes neighbors = {self.nodes}")
-
-        # Creating graph object
-        self.G = nx.Graph()
-        edges_mod = [
-            (x[0], x[1], {"weight": x[2], "color": x[3]}) for x in self.edges
-        ]
-        self.G.add_edges_from(edges_mod)
+        self.backend = backend
+        self._G = None
+        if self.backend == "csr":
+            self.E, self.V, self.vertices, self.csr = fh.read_csr()
+            # csr is a CSRGraph holding the indptr/indices/weights adjacency arrays,
+            # the networkx graph is only built from it if the GUI is shown
+            logger.debug("Instance loaded")
+            logger.debug(f"{self.V} nodes = {self.vertices}")
+            logger.debug(f"{self.E} edges, CSR indptr = {self.csr.indptr}")
+        else:
+            (
+                self.E,
+                self.V,
+                self.vertices,
+                self.edges,
+                self.edge_index,
+                self.nodes,
+            ) = fh.read()
+            # E is total number of edges
+            # V is total number of vertices/nodes
+            # vertices is a dictionary that contain vertex id as key
+            # and a tuple (position x, position y) as value
+            # edges is a list of tuples (source, destination, weight, color)
+            # edge_index is a dictionary that stores the index of each edges
+            # in the list above
+            # nodes is a dictionary where we can get direct neighbors of each nodes
+            # and the color assigned to each node
+            logger.debug("Instance loaded")
+            logger.debug(f"{self.V} nodes = {self.vertices}")
+            logger.debug(f"{self.E} edges = {self.edges}")
+            logger.debug(f"Edges index = {self.edge_index}")
+            logger.debug(f"Nodes neighbors = {self.nodes}")
+
+            # Creating graph object
+            self._G = nx.Graph()
+            edges_mod = [
+                (x[0], x[1], {"weight": x[2], "color": x[3]})
+                for x in self.edges
+            ]
+            self._G.add_edges_from(edges_mod)
+
+        # Coordinates as an array,
+        # used to compute the heuristic of all the nodes at once
+        self.coords = np.array(
+            [self.vertices[i] for i in range(self.V)], dtype=np.float64
+        )
+        # Uniform grid over the coordinates, used to snap points to the nearest node
+        # and to find the nodes of the corridor between start and goal
+        self.spatial = GridIndex(self.coords)
+        # With a corridor margin, the search ignores the nodes outside the bounding
+        # box of start and goal expanded by corridor times its largest side.
+        # allowed[n] tells if node n can be visited by the current query,
+        # None when every node can be
+        self.corridor = corridor
+        self.allowed = None
+
+        # Distance tables of the ALT heuristic,
+        # computed once and stored next to the instance
+        self.landmarks = None
+        if heuristic == Heuristic.LANDMARKS:
+            graph = self.csr if self.backend == "csr" else fh.read_csr()[3]
+            self.landmarks = Landmarks.load_or_build(
+                fh, graph, landmarks, logger
+            )
+            logger.debug(f"Landmarks: {self.landmarks.landmarks}")
+
+        # All pairs shortest distances used as an exact heuristic, computed once
+        # in parallel with processes workers and memory mapped from the instance
+        # cache afterwards
+        self.distance_table = None
+        if heuristic == Heuristic.EXACT:
+            graph = self.csr if self.backend == "csr" else fh.read_csr()[3]
+            self.distance_table = DistanceTable.load_or_build(
+                fh, graph, "all", None, logger, processes
+            )
+
+        # "astar" runs one of the A* variants, "ch" queries a contraction hierarchy
+        # built once for the instance and stored next to it
+        self.engine = engine
+        self.ch = None
+        if self.engine == "ch":
+            graph = self.csr if self.backend == "csr" else fh.read_csr()[3]
+            self.ch = ContractionHierarchy.load_or_build(fh, graph, logger)
 
         # These attributes are used for the graphical aspect of the code.
-        self.history = []
+        self.history = History(
+            record,
+            every=record_every,
+            budget=record_budget,
+            group=2 if is_bidirectional else 1,
+        )
 
+        # Query, by default from node 0 to node 1 as in the instance files
+        self.start = start
+        self.goal = goal
         # Path and cost of the best solution found
         self.path = []
         self.cost = 0
+        # Search statistics: number of nodes expanded by the forward and the backward
+        # search, number of iterations and largest number of entries in the queues
+        self.expanded = [0, 0]
+        self.iterations = 0
+        self.peak_queue = 0
         self.logger = logger
         self.is_bidirectional = is_bidirectional
+        # "first" stops at the first node reached by both searches,
+        # "optimal" keeps searching until the best meeting cost is proven
+        self.bidirectional_mode = bidirectional_mode
+        # With parent pointers, the queue only holds (f, g, node)
+        # and the path is rebuilt at the end
+        self.parent_pointers = parent_pointers
+        # Open list of the unidirectional search with parent pointers,
+        # one of PriorityQueue.QUEUES
+        self.queue = queue
         self.heuristic_type = heuristic
-        self.name = "A* {} {}".format(
-            self.heuristic_type,
-            "bidirectionnal" if self.is_bidirectional else "",
-        )
+        if self.engine == "ch":
+            self.name = "Contraction hierarchies"
+        else:
+            self.name = "A* {} {}".format(
+                self.heuristic_type,
+                "bidirectionnal" if self.is_bidirectional else "",
+            )
+
+        # Functions used by the searches for their open lists. An Instrumentation
+        # replaces them, together with neighbors, heuristic_to and history.record,
+        # by counting and timed wrappers; without it the searches call the plain
+        # functions
+        self.heappush = heapq.heappush
+        self.heappop = heapq.heappop
+        self.make_queue = make_queue
+        self.instrumentation = instrumentation
+        if self.instrumentation is not None:
+            self.instrumentation.attach(self)
+
+    def reset(self, start, goal):
+        """
+        Prepare a new query between start and goal, the loaded instance and the
+        preprocessed data (landmarks, contraction hierarchy) are kept
+        """
+        self.start = start
+        self.goal = goal
+        self.path = []
+        self.cost = 0
+        self.expanded = [0, 0]
+        self.iterations = 0
+        self.peak_queue = 0
+        self.history.clear()
+
+    @property
+    def G(self):
+        """
+        Graph object used by the GUI, built on first access for the CSR backend
+        """
+        if self._G is None:
+            self._G = nx.Graph()
+            self._G.add_edges_from(
+                (u, v, {"weight": w, "color": "black"})
+                for (u, v, w) in self.csr.edges()
+            )
+        return self._G
+
+    def neighbors(self, node):
+        """
+        Return the direct neighbors of a node as (neighbor, weight) pairs
+        """
+        if self.backend == "csr":
+            pairs = self.csr.neighbors(node)
+        else:
+            pairs = (
+                (n, attributes["weight"])
+                for n, attributes in self.G.adj[node].items()
+            )
+        if self.allowed is not None:
+            allowed = self.allowed
+            return ((n, weight) for n, weight in pairs if allowed[n])
+        return pairs
+
+    def nearest_node(self, x, y):
+        """
+        Return the node closest to the point (x, y)
+        """
+        return self.spatial.nearest(x, y)
 
     def show(self):
         """
@@ -84,42 +259,93 @@ class Algorithm:
             self.is_bidirectional,
             self.name,
             self.logger,
+            start=self.start,
+            goal=self.goal,
         )
         gui.show()
 
-    def run(self):
+    def run(self, changes=None):
         """
-        Run desired solve function with time measurement
+        Run desired solve function with time measurement.
+        changes is an optional list of batches of (source, destination, weight) edge
+        weight changes, the path is then repaired incrementally after each batch
         """
         self.logger.info(self.name)
+        if self.instrumentation is not None:
+            self.instrumentation.clear()
         start = time.time()
 
-        if self.is_bidirectional:
-            self.solve_bidirectional()
+        if changes is not None:
+            self.solve_incremental(changes)
+        elif self.engine == "ch":
+            self.solve_ch()
+        elif self.corridor is not None:
+            mask = np.zeros(self.V, dtype=bool)
+            mask[self.spatial.corridor(self.start, self.goal, self.corridor)] = True
+            self.allowed = mask.tolist()
+            self.logger.info(
+                f"Search restricted to the {int(mask.sum())} nodes of the corridor"
+            )
+            self.search()
+            self.allowed = None
+            if len(self.path) == 0:
+                # the corridor may cut every path, search again on the whole graph
+                self.logger.info(
+                    "No path inside the corridor, searching the whole graph"
+                )
+                self.history.clear()
+                self.search()
         else:
-            self.solve()
+            self.search()
 
         end = time.time()
+        if self.is_bidirectional or self.engine == "ch":
+            self.logger.info(
+                f"Nodes expanded: {sum(self.expanded)} "
+                f"(forward {self.expanded[0]}, backward {self.expanded[1]})"
+            )
+        else:
+            self.logger.info(f"Nodes expanded: {self.expanded[0]}")
         self.logger.info(f"Time elapsed: {(end-start)*1000:.2f}ms")
+        if self.instrumentation is not None:
+            self.instrumentation.dump(self, self.logger)
+
+    def search(self):
+        """
+        Run the A* variant selected by the options
+        """
+        if self.is_bidirectional and self.bidirectional_mode == "optimal":
+            self.solve_bidirectional_optimal()
+        elif self.is_bidirectional and self.parent_pointers:
+            self.solve_bidirectional_parents()
+        elif self.is_bidirectional:
+            self.solve_bidirectional()
+        elif self.parent_pointers or self.queue != "binary":
+            self.solve_parents()
+        else:
+            self.solve()
 
     def solve(self):
         """
         Solve the problem using the unidirectional A*
         """
-        start = 0
-        goal = 1
+        start = self.start
+        goal = self.goal
         # items in priority queue:
         # (heuristic (to minimize), current node number, [list of nodes] )
         q = [(0, start, [start])]
         heapq.heapify(q)
         g_scores = {start: 0}
+        h = self.heuristic_to(goal)
         iterations = -1
 
         while len(q) != 0:
             iterations += 1
-            self.history.append(copy.deepcopy(q))
-            self.history[-1].sort()
-            (_, current_node, list_of_nodes) = heapq.heappop(q)
+            if len(q) > self.peak_queue:
+                self.peak_queue = len(q)
+            self.history.record(iterations, q)
+            (_, current_node, list_of_nodes) = self.heappop(q)
+            self.expanded[0] += 1
             self.logger.debug(
                 f"Iteration {iterations}, current node: {current_node}, list of nodes: {list_of_nodes}"
             )
@@ -129,15 +355,15 @@ class Algorithm:
                 break
 
             # explore neighboors of the current onde
-            for n in list(self.G.adj[current_node]):
-                weight = self.G.edges[current_node, n]["weight"]
+            for n, weight in self.neighbors(current_node):
                 g = g_scores[current_node] + weight
-                f = g + self.heuristic(n, goal)
+                f = g + h[n]
                 # if this node hasnt been visited yet or the travel cost is smaller, add it to priority queue
                 if n not in g_scores or g < g_scores[n]:
-                    heapq.heappush(q, (f, n, list_of_nodes + [n]))
+                    self.heappush(q, (f, n, list_of_nodes + [n]))
                     g_scores[n] = g
 
+        self.iterations = iterations
         if len(self.path) == 0:
             self.logger.warn("No solution found")
             return
@@ -150,8 +376,8 @@ class Algorithm:
         """
         Solve the problem using the bidirectional A* in a sequential way
         """
-        start = 0
-        goal = 1
+        start = self.start
+        goal = self.goal
         direction = 0  # 0 or 1
 
         def other(a):
@@ -161,24 +387,31 @@ class Algorithm:
         heapq.heapify(q[0])
         heapq.heapify(q[1])
         g_scores = [{start: 0}, {goal: 0}]
-        save_path = [{start: []}, {goal: []}]
-        node_goal = [goal, start]
+        save_path = [{start: [start]}, {goal: [goal]}]
+        h = [self.heuristic_to(goal), self.heuristic_to(start)]
 
         keep_searching = True
         iterations = -1
+        if start == goal:
+            # both searches already meet on the start node
+            self.path = [start]
+            self.cost = 0
+            keep_searching = False
 
-        while len(q) != 0 and keep_searching:
+        # the search fails as soon as one of the frontiers is empty
+        while len(q[0]) != 0 and len(q[1]) != 0 and keep_searching:
             iterations += 1
-            self.history.append(copy.deepcopy(q[direction]))
-            self.history[-1].sort()
-            (_, current_node, list_of_nodes) = heapq.heappop(q[direction])
+            if len(q[0]) + len(q[1]) > self.peak_queue:
+                self.peak_queue = len(q[0]) + len(q[1])
+            self.history.record(iterations, q[direction])
+            (_, current_node, list_of_nodes) = self.heappop(q[direction])
+            self.expanded[direction] += 1
             self.logger.debug(
                 f"Iteration {iterations}, current node: {current_node}, direction: {direction}, list of nodes: {list_of_nodes}"
             )
-            for n in list(self.G.adj[current_node]):
-                weight = self.G.edges[current_node, n]["weight"]
+            for n, weight in self.neighbors(current_node):
                 g = g_scores[direction][current_node] + weight
-                f = g + self.heuristic(n, node_goal[direction])
+                f = g + h[direction][n]
                 if n not in g_scores[direction] or g < g_scores[direction][n]:
                     if n in save_path[other(direction)]:
                         merged_path = copy.deepcopy(
@@ -189,22 +422,168 @@ class Algorithm:
                         self.cost = g + g_scores[other(direction)][n]
                         if self.path[0] == goal:
                             self.path.reverse()
-                        self.history.append(
-                            copy.deepcopy(
-                                [(self.cost, goal, self.path)] + q[direction]
-                            )
+                        self.history.record(
+                            iterations,
+                            [(self.cost, goal, self.path)] + q[direction],
+                            convert=copy.deepcopy,
+                            force=True,
                         )
                         keep_searching = False
                         break
                     else:
                         save_path[direction][n] = list_of_nodes + [n]
-                        heapq.heappush(
+                        self.heappush(
                             q[direction], (f, n, list_of_nodes + [n])
                         )
                         g_scores[direction][n] = g
 
             direction = other(direction)
 
+        self.iterations = iterations
+        if len(self.path) == 0:
+            self.logger.warn("No solution found")
+            return
+        self.logger.info(
+            f"Found path to goal with cost {self.cost:.2f} in {iterations} iterations"
+        )
+        self.logger.info(f"Path: {self.path}")
+
+    def solve_parents(self):
+        """
+        Solve the problem using the unidirectional A*, keeping a predecessor map
+        instead of a copy of the path in each queue entry
+        """
+        start = self.start
+        goal = self.goal
+        # items in priority queue:
+        # (heuristic (to minimize), travel cost, current node number)
+        q = self.make_queue(self.queue)
+        q.push((0, 0, start))
+        g_scores = {start: 0}
+        parents = {start: None}
+        closed = set()
+        h = self.heuristic_to(goal)
+        iterations = -1
+        frame = functools.partial(self.frame, parents=parents)
+
+        while len(q) != 0:
+            iterations += 1
+            if len(q) > self.peak_queue:
+                self.peak_queue = len(q)
+            self.history.record(iterations, q, convert=frame)
+            (_, g_current, current_node) = q.pop()
+            # skip stale entries, the node was already expanded with a better cost
+            if current_node in closed:
+                continue
+            closed.add(current_node)
+            self.expanded[0] += 1
+            self.logger.debug(
+                f"Iteration {iterations}, current node: {current_node}, "
+                f"cost: {g_current}"
+            )
+            if current_node == goal:
+                self.path = self.build_path(parents, goal)
+                self.cost = g_current
+                break
+
+            # explore neighboors of the current onde
+            for n, weight in self.neighbors(current_node):
+                g = g_current + weight
+                # if this node hasnt been visited yet or the travel cost is smaller, add it to priority queue
+                if n not in g_scores or g < g_scores[n]:
+                    g_scores[n] = g
+                    parents[n] = current_node
+                    closed.discard(n)
+                    q.push((g + h[n], g, n))
+
+        self.iterations = iterations
+        if len(self.path) == 0:
+            self.logger.warn("No solution found")
+            return
+        self.logger.info(
+            f"Found path to goal with cost {self.cost:.2f} in {iterations} iterations"
+        )
+        self.logger.info(f"Path: {self.path}")
+
+    def solve_bidirectional_parents(self):
+        """
+        Solve the problem using the bidirectional A* in a sequential way,
+        keeping a predecessor map for each direction
+        """
+        start = self.start
+        goal = self.goal
+        direction = 0  # 0 or 1
+
+        def other(a):
+            return int(not a)
+
+        q = [[(0, 0, start)], [(0, 0, goal)]]
+        g_scores = [{start: 0}, {goal: 0}]
+        parents = [{start: None}, {goal: None}]
+        closed = [set(), set()]
+        h = [self.heuristic_to(goal), self.heuristic_to(start)]
+        frame = [
+            functools.partial(self.frame, parents=parents[0]),
+            functools.partial(self.frame, parents=parents[1]),
+        ]
+
+        keep_searching = True
+        iterations = -1
+
+        while len(q[0]) != 0 and len(q[1]) != 0 and keep_searching:
+            iterations += 1
+            if len(q[0]) + len(q[1]) > self.peak_queue:
+                self.peak_queue = len(q[0]) + len(q[1])
+            self.history.record(
+                iterations, q[direction], convert=frame[direction]
+            )
+            (_, g_current, current_node) = self.heappop(q[direction])
+            if current_node not in closed[direction]:
+                closed[direction].add(current_node)
+                self.expanded[direction] += 1
+                self.logger.debug(
+                    f"Iteration {iterations}, current node: {current_node}, "
+                    f"direction: {direction}, cost: {g_current}"
+                )
+                for n, weight in self.neighbors(current_node):
+                    g = g_current + weight
+                    if (
+                        n in g_scores[direction]
+                        and g >= g_scores[direction][n]
+                    ):
+                        continue
+                    if n in g_scores[other(direction)]:
+                        merged_path = self.build_path(
+                            parents[other(direction)], n
+                        )
+                        merged_path.reverse()
+                        self.path = (
+                            self.build_path(parents[direction], current_node)
+                            + merged_path
+                        )
+                        self.cost = g + g_scores[other(direction)][n]
+                        if self.path[0] == goal:
+                            self.path.reverse()
+                        self.history.record(
+                            iterations,
+                            q[direction],
+                            convert=lambda q: [(self.cost, goal, self.path)]
+                            + frame[direction](q),
+                            force=True,
+                        )
+                        keep_searching = False
+                        break
+                    g_scores[direction][n] = g
+                    parents[direction][n] = current_node
+                    closed[direction].discard(n)
+                    self.heappush(
+                        q[direction],
+                        (g + h[direction][n], g, n),
+                    )
+
+            direction = other(direction)
+
+        self.iterations = iterations
         if len(self.path) == 0:
             self.logger.warn("No solution found")
             return
@@ -213,6 +592,281 @@ class Algorithm:
         )
         self.logger.info(f"Path: {self.path}")
 
+    def solve_bidirectional_optimal(self):
+        """
+        Solve the problem using the bidirectional A* with consistent (averaged)
+        potentials.
+        The forward search uses pf(v) = (h(v, goal) - h(v, start) + h(start, goal)) / 2
+        and the backward search pb(v) = h(start, goal) - pf(v), both are consistent
+        and their sum is constant, so the search can stop as soon as
+        top_f + top_b >= mu + h(start, goal), mu being the cost of the best path found
+        """
+        start = self.start
+        goal = self.goal
+        direction = 0  # 0 or 1
+
+        def other(a):
+            return int(not a)
+
+        h_goal = np.asarray(self.heuristic_to(goal), dtype=np.float64)
+        h_start = np.asarray(self.heuristic_to(start), dtype=np.float64)
+        h_total = h_goal[start]
+        pf = (h_goal - h_start + h_total) / 2
+        potential = [pf.tolist(), (h_total - pf).tolist()]
+
+        # items in priority queues: (key, travel cost, node)
+        q = [
+            [(potential[0][start], 0, start)],
+            [(potential[1][goal], 0, goal)],
+        ]
+        g_scores = [{start: 0}, {goal: 0}]
+        parents = [{start: None}, {goal: None}]
+        closed = [set(), set()]
+        frame = [
+            functools.partial(self.frame, parents=parents[0]),
+            functools.partial(self.frame, parents=parents[1]),
+        ]
+        # Best meeting cost found so far and the edge where both searches meet
+        mu = float("inf")
+        meeting = None
+        if start == goal:
+            # both searches already meet on the start node, there is no edge to relax
+            mu = 0
+            meeting = (0, start, None)
+        iterations = -1
+
+        while len(q[0]) != 0 and len(q[1]) != 0:
+            if q[0][0][0] + q[1][0][0] >= mu + h_total:
+                break
+            iterations += 1
+            if len(q[0]) + len(q[1]) > self.peak_queue:
+                self.peak_queue = len(q[0]) + len(q[1])
+            self.history.record(
+                iterations, q[direction], convert=frame[direction]
+            )
+            (_, g_current, current_node) = self.heappop(q[direction])
+            if current_node not in closed[direction]:
+                closed[direction].add(current_node)
+                self.expanded[direction] += 1
+                self.logger.debug(
+                    f"Iteration {iterations}, current node: {current_node}, "
+                    f"direction: {direction}, cost: {g_current}, mu: {mu}"
+                )
+                for n, weight in self.neighbors(current_node):
+                    g = g_current + weight
+                    if n in g_scores[other(direction)]:
+                        meeting_cost = g + g_scores[other(direction)][n]
+                        if meeting_cost < mu:
+                            mu = meeting_cost
+                            meeting = (direction, current_node, n)
+                    if (
+                        n in g_scores[direction]
+                        and g >= g_scores[direction][n]
+                    ):
+                        continue
+                    g_scores[direction][n] = g
+                    parents[direction][n] = current_node
+                    closed[direction].discard(n)
+                    self.heappush(
+                        q[direction], (g + potential[direction][n], g, n)
+                    )
+
+            direction = other(direction)
+
+        self.iterations = iterations
+        if meeting is None:
+            self.logger.warn("No solution found")
+            return
+        (meeting_direction, node, n) = meeting
+        merged_path = []
+        if n is not None:
+            merged_path = self.build_path(parents[other(meeting_direction)], n)
+            merged_path.reverse()
+        self.path = self.build_path(parents[meeting_direction], node) + merged_path
+        if self.path[0] == goal:
+            self.path.reverse()
+        self.cost = sum(
+            self.edge_weight(i, k)
+            for i, k in zip(self.path[0::1], self.path[1::1])
+        )
+        self.history.record(
+            iterations,
+            q[meeting_direction],
+            convert=lambda q: [(self.cost, goal, self.path)]
+            + frame[meeting_direction](q),
+            force=True,
+        )
+        self.logger.info(
+            f"Found path to goal with cost {self.cost:.2f} in {iterations} iterations"
+        )
+        self.logger.info(f"Path: {self.path}")
+
+    def solve_ch(self):
+        """
+        Solve the problem with the bidirectional upward search
+        of the contraction hierarchy
+        """
+        start = self.start
+        goal = self.goal
+        (cost, path, settled) = self.ch.query(start, goal)
+        self.expanded = settled
+        self.iterations = sum(settled)
+        if len(path) == 0:
+            self.logger.warn("No solution found")
+            return
+        self.path = path
+        self.cost = cost
+        self.history.record(
+            0,
+            [],
+            convert=lambda q: [(self.cost, goal, self.path)],
+            force=True,
+        )
+        self.logger.info(
+            f"Found path to goal with cost {self.cost:.2f} in {sum(settled)} iterations"
+        )
+        self.logger.info(f"Path: {self.path}")
+
+    def solve_incremental(self, changes):
+        """
+        Solve the problem with LPA*, then repair the shortest path after each batch of
+        edge weight changes, reusing the g/rhs values of the previous search.
+        The work of each repair is compared with a search restarted from scratch
+        on the changed graph
+        """
+        start = self.start
+        goal = self.goal
+        h = self.consistent_heuristic_to(goal)
+        planner = LPAStar(self.neighbors, start, goal, h)
+        self.cost = planner.compute_shortest_path()
+        self.expanded = [planner.expanded, 0]
+        self.iterations = planner.expanded
+        self.logger.info(
+            f"Initial path cost {self.cost:.2f}, {planner.expanded} nodes expanded"
+        )
+
+        # Statistics of each repair: cost of the new path, nodes expanded and nodes
+        # touched (queued or expanded) by the repair and by a search from scratch
+        self.replanning = []
+        for index, batch in enumerate(changes):
+            for (u, v, weight) in batch:
+                if weight < abs(h[u] - h[v]):
+                    self.logger.warning(
+                        f"Edge {u}-{v} with weight {weight} makes the "
+                        f"{self.heuristic_type} heuristic inconsistent, "
+                        "the path may not be optimal"
+                    )
+            repair_start = time.time()
+            cost = planner.replan(batch)
+            repair_time = time.time() - repair_start
+
+            rerun_start = time.time()
+            rerun = LPAStar(
+                lambda node: planner.neighbors(node).items(), start, goal, h
+            )
+            rerun.compute_shortest_path()
+            rerun_time = time.time() - rerun_start
+
+            self.replanning.append(
+                {
+                    "batch": index,
+                    "changes": len(batch),
+                    "cost": cost,
+                    "expanded": planner.expanded,
+                    "touched": len(planner.touched),
+                    "rerun_expanded": rerun.expanded,
+                    "rerun_touched": len(rerun.touched),
+                }
+            )
+            self.expanded[0] += planner.expanded
+            self.iterations += planner.expanded
+            self.logger.info(
+                f"Batch {index} ({len(batch)} changes): cost {cost:.2f}, "
+                f"{len(planner.touched)} nodes touched and {planner.expanded} expanded "
+                f"in {repair_time*1000:.2f}ms, full rerun: {len(rerun.touched)} "
+                f"touched and {rerun.expanded} expanded in {rerun_time*1000:.2f}ms"
+            )
+
+        self.cost = planner.g.get(goal, float("inf"))
+        self.path = planner.path()
+        if len(self.path) == 0:
+            self.logger.warn("No solution found")
+            return
+        self.logger.info(f"Found path to goal with cost {self.cost:.2f}")
+        self.logger.info(f"Path: {self.path}")
+
+    def edge_weight(self, a, b):
+        """
+        Return the weight of the edge between node a and b
+        """
+        return min(weight for n, weight in self.neighbors(a) if n == b)
+
+    @staticmethod
+    def build_path(parents, node):
+        """
+        Rebuild the path from the root of the predecessor map to the given node
+        """
+        path = []
+        while node is not None:
+            path.append(node)
+            node = parents[node]
+        path.reverse()
+        return path
+
+    def frame(self, q, parents):
+        """
+        Convert (f, g, node) queue entries into the (f, node, path) states
+        displayed by the GUI
+        """
+        return sorted(
+            (f, node, self.build_path(parents, node)) for (f, _, node) in q
+        )
+
+    def heuristic_to(self, goal):
+        """
+        Return the list of the heuristic values between every node and goal.
+        It is computed once per query with NumPy,
+        so the search loop only does a list lookup
+        """
+        if self.heuristic_type == Heuristic.DIJKSTRA:
+            return [0] * self.V
+        if self.heuristic_type == Heuristic.LANDMARKS:
+            return self.landmarks.heuristic_to(goal).tolist()
+        if self.heuristic_type == Heuristic.EXACT:
+            return self.distance_table.heuristic_to(goal).tolist()
+        dx = np.abs(self.coords[:, 0] - self.coords[goal, 0])
+        dy = np.abs(self.coords[:, 1] - self.coords[goal, 1])
+        geometric = GEOMETRIC_HEURISTICS.get(
+            self.heuristic_type, GEOMETRIC_HEURISTICS[Heuristic.MANHATTAN]
+        )
+        return geometric(dx, dy).tolist()
+
+    def consistent_heuristic_to(self, goal):
+        """
+        Return the heuristic values between every node and goal, scaled down so that
+        h(u) <= w(u, v) + h(v) holds on every edge as required by LPA*.
+        The geometric heuristics are bounded by the euclidean distance, but the weights
+        of the instances are rounded and can be slightly shorter than it
+        """
+        h = np.asarray(self.heuristic_to(goal), dtype=np.float64)
+        if self.heuristic_type in (
+            Heuristic.DIJKSTRA,
+            Heuristic.LANDMARKS,
+            Heuristic.EXACT,
+        ):
+            return h.tolist()
+        if self.backend == "csr":
+            src = np.repeat(np.arange(self.V), np.diff(self.csr.indptr))
+            dst = self.csr.indices
+            weights = self.csr.weights
+        else:
+            src = np.array([x[0] for x in self.edges], dtype=np.int64)
+            dst = np.array([x[1] for x in self.edges], dtype=np.int64)
+            weights = np.array([x[2] for x in self.edges], dtype=np.float64)
+        length = np.hypot(*(self.coords[src] - self.coords[dst]).T)
+        ratios = weights[length > 0] / length[length > 0]
+        return (h * min(1, ratios.min(initial=1))).tolist()
+
     def heuristic(self, a, b):
         """
         Return heuristic between node a and b
@@ -229,5 +883,9 @@ class Algorithm:
             return max(dx, dy)
         if self.heuristic_type == Heuristic.DIJKSTRA:
             return 0
+        if self.heuristic_type == Heuristic.LANDMARKS:
+            return self.landmarks.heuristic(a, b)
+        if self.heuristic_type == Heuristic.EXACT:
+            return self.distance_table.distance(b, a)
         else:
             return (dx + dy) / 2
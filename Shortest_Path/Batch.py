@@ -0,0 +1,121 @@
+import csv
+import logging
+import multiprocessing
+
+import numpy as np
+
+from Algorithm import Algorithm
+from FileHandler import FileHandler
+from SpatialIndex import GridIndex
+from DistanceTable import compute_distances
+
+# Per process state of the pool workers. The instance is loaded once per worker from the
+# binary cache, whose arrays are memory mapped read-only and thus shared between processes.
+_algorithm = None
+
+
+def read_queries(file_name):
+    """
+    Read a CSV file of queries, one "source,target" pair of node ids per line, or
+    one "source x,source y,target x,target y" line of coordinates to snap to the nearest nodes.
+    A first line that is not made of numbers is considered as a header.
+    """
+    queries = []
+    with open(file_name, "r", newline="") as f:
+        for row in csv.reader(f):
+            if len(row) < 2:
+                continue
+            try:
+                if len(row) >= 4:
+                    queries.append(tuple(float(x) for x in row[:4]))
+                else:
+                    queries.append((int(row[0]), int(row[1])))
+            except ValueError:
+                if len(queries) != 0:
+                    raise
+    return queries
+
+
+def snap_queries(instance, queries):
+    """
+    Replace the (source x, source y, target x, target y) queries by the pair of
+    nodes closest to these points, (source, target) queries are kept as is
+    """
+    if all(len(query) == 2 for query in queries):
+        return queries
+    vertices = FileHandler(instance).read_csr()[2]
+    index = GridIndex([vertices[i] for i in range(len(vertices))])
+    return [
+        query
+        if len(query) == 2
+        else (index.nearest(query[0], query[1]), index.nearest(query[2], query[3]))
+        for query in queries
+    ]
+
+
+def _init_solver(instance, options):
+    global _algorithm
+    logger = logging.getLogger("shortest-path-batch")
+    logger.setLevel(logging.WARNING)
+    _algorithm = Algorithm(instance, logger=logger, **options)
+
+
+def _solve(query):
+    (source, target) = query
+    _algorithm.reset(source, target)
+    _algorithm.run()
+    if len(_algorithm.path) == 0:
+        return source, target, float("inf"), [], sum(_algorithm.expanded)
+    return (
+        source,
+        target,
+        _algorithm.cost,
+        list(_algorithm.path),
+        sum(_algorithm.expanded),
+    )
+
+
+def solve_queries(instance, queries, processes=1, **options):
+    """
+    Answer every (source, target) query of the list on the same instance.
+    options are passed to Algorithm, the search history is never recorded.
+    Return a list of (source, target, cost, path, expanded nodes) in the order of the queries.
+    """
+    options = dict(options, record="none", backend="csr")
+    # Loading the instance once here writes the binary cache (and the landmarks, the
+    # contraction hierarchy or the distances of the Exact heuristic, computed with
+    # processes workers) before the workers start reading it.
+    _init_solver(instance, dict(options, processes=processes))
+    if processes == 1:
+        return [_solve(query) for query in queries]
+    chunksize = max(1, len(queries) // (4 * processes))
+    with multiprocessing.Pool(
+        processes, initializer=_init_solver, initargs=(instance, options)
+    ) as pool:
+        return pool.map(_solve, queries, chunksize=chunksize)
+
+
+def distance_matrix(instance, sources, targets, processes=1):
+    """
+    Many-to-many shortest distances, one Dijkstra per source.
+    Return an array of shape (len(sources), len(targets)), inf when a target is unreachable.
+    """
+    graph = FileHandler(instance).read_csr()[3]
+    rows = compute_distances(graph, sources, processes=processes, dtype=np.float64)
+    return rows[:, np.asarray(targets, dtype=np.int64)]
+
+
+def write_results(f, results):
+    writer = csv.writer(f)
+    writer.writerow(["source", "target", "cost", "expanded", "path"])
+    for (source, target, cost, path, expanded) in results:
+        writer.writerow(
+            [source, target, f"{cost:.2f}", expanded, " ".join(map(str, path))]
+        )
+
+
+def write_matrix(f, sources, targets, matrix):
+    writer = csv.writer(f)
+    writer.writerow(["source"] + list(targets))
+    for source, row in zip(sources, matrix.tolist()):
+        writer.writerow([source] + [f"{d:.2f}" for d in row])
@@ -0,0 +1,92 @@
+import heapq
+
+import numpy as np
+
+
+class CSRGraph:
+    """
+    Compressed sparse row (CSR) adjacency of an undirected weighted graph.
+    The neighbors of node u are indices[indptr[u]:indptr[u + 1]] and the
+    weights of the corresponding edges are stored at the same positions in weights.
+    """
+
+    def __init__(self, indptr, indices, weights):
+        self.indptr = np.asarray(indptr, dtype=np.int64)
+        self.indices = np.asarray(indices, dtype=np.int32)
+        self.weights = np.asarray(weights, dtype=np.float64)
+        # V is total number of vertices/nodes
+        # E is total number of (undirected) edges, each one is stored in both directions
+        self.V = len(self.indptr) - 1
+        self.E = len(self.indices) // 2
+
+        # Indexing NumPy arrays one scalar at a time is slow in pure Python,
+        # so the search loops work on plain list copies of the arrays.
+        self._indptr = self.indptr.tolist()
+        self._indices = self.indices.tolist()
+        self._weights = self.weights.tolist()
+
+    @classmethod
+    def from_edges(cls, V, src, dst, weights):
+        """
+        Build the graph from a list of undirected edges (src[i], dst[i], weights[i])
+        """
+        return cls(*cls.csr_arrays(V, src, dst, weights))
+
+    @staticmethod
+    def csr_arrays(V, src, dst, weights):
+        """
+        Return the (indptr, indices, weights) CSR arrays of a list of undirected edges
+        """
+        src = np.asarray(src, dtype=np.int64)
+        dst = np.asarray(dst, dtype=np.int64)
+        weights = np.asarray(weights, dtype=np.float64)
+        # Store every edge in both directions, then group the entries by source node
+        heads = np.concatenate((src, dst))
+        tails = np.concatenate((dst, src))
+        both_weights = np.concatenate((weights, weights))
+        order = np.argsort(heads, kind="stable")
+        indptr = np.zeros(V + 1, dtype=np.int64)
+        np.cumsum(np.bincount(heads, minlength=V), out=indptr[1:])
+        return indptr, tails[order], both_weights[order]
+
+    def neighbors(self, node):
+        """
+        Return the direct neighbors of a node as (neighbor, weight) pairs
+        """
+        begin = self._indptr[node]
+        end = self._indptr[node + 1]
+        return zip(self._indices[begin:end], self._weights[begin:end])
+
+    def degree(self, node):
+        return self._indptr[node + 1] - self._indptr[node]
+
+    def edges(self):
+        """
+        Iterate over the undirected edges (source, destination, weight), each one once
+        """
+        for u in range(self.V):
+            for v, w in self.neighbors(u):
+                if u < v:
+                    yield u, v, w
+
+    def sssp(self, source):
+        """
+        Dijkstra from source, return the array of the distances to every node (inf if unreachable)
+        """
+        dist = [float("inf")] * self.V
+        dist[source] = 0
+        q = [(0, source)]
+        indptr = self._indptr
+        indices = self._indices
+        weights = self._weights
+        while len(q) != 0:
+            (d, node) = heapq.heappop(q)
+            if d > dist[node]:
+                continue
+            for i in range(indptr[node], indptr[node + 1]):
+                nd = d + weights[i]
+                n = indices[i]
+                if nd < dist[n]:
+                    dist[n] = nd
+                    heapq.heappush(q, (nd, n))
+        return np.array(dist)
@@ -0,0 +1,292 @@
+import heapq
+import os
+
+import numpy as np
+
+
+class ContractionHierarchy:
+    """
+    Contraction hierarchies (CH) over an undirected CSRGraph.
+
+    Preprocessing contracts the nodes one by one, from the least to the most important one.
+    When a node v is contracted, a shortcut u-w of weight w(u, v) + w(v, w) is added between
+    two of its remaining neighbors unless a witness path, not going through v, is at least as short.
+    A query is then a bidirectional Dijkstra that only follows edges toward more important
+    nodes (the upward graph), and the shortcuts of the resulting path are unpacked recursively.
+    """
+
+    # Limit on the number of nodes settled by a witness search, a missed witness
+    # only adds an unnecessary shortcut, it never breaks the correctness.
+    WITNESS_SETTLED_LIMIT = 50
+    # Smaller limit of the witness searches that only estimate the priority of a node
+    SIMULATION_SETTLED_LIMIT = 10
+
+    def __init__(self, rank, up_indptr, up_indices, up_weights, up_middle):
+        # rank[v] is the contraction order of v
+        # up_* is the CSR of the upward graph, up_middle is -1 for an original edge
+        # and the contracted node for a shortcut
+        self.rank = np.asarray(rank, dtype=np.int64)
+        self.up_indptr = np.asarray(up_indptr, dtype=np.int64)
+        self.up_indices = np.asarray(up_indices, dtype=np.int32)
+        self.up_weights = np.asarray(up_weights, dtype=np.float64)
+        self.up_middle = np.asarray(up_middle, dtype=np.int32)
+        self.V = len(self.rank)
+        self.shortcuts = int(np.count_nonzero(self.up_middle >= 0))
+
+        self._rank = self.rank.tolist()
+        self._indptr = self.up_indptr.tolist()
+        self._indices = self.up_indices.tolist()
+        self._weights = self.up_weights.tolist()
+        # middle node of each upward edge, keyed by (lower node, higher node)
+        self._middle = {}
+        middle = self.up_middle.tolist()
+        for u in range(self.V):
+            for i in range(self._indptr[u], self._indptr[u + 1]):
+                self._middle[(u, self._indices[i])] = middle[i]
+
+    @classmethod
+    def build(cls, graph, logger=None):
+        """
+        Contract all the nodes of the graph and return the resulting hierarchy
+        """
+        V = graph.V
+        # adjacency of the remaining graph: adj[u][v] = (weight, middle node)
+        adj = [dict() for _ in range(V)]
+        for u, v, w in graph.edges():
+            if v not in adj[u] or w < adj[u][v][0]:
+                adj[u][v] = (w, -1)
+                adj[v][u] = (w, -1)
+
+        deleted_neighbors = [0] * V
+        level = [0] * V
+        rank = [0] * V
+        up = [None] * V
+        # a priority is outdated once a neighbor of the node is contracted
+        outdated = [False] * V
+
+        def priority(v):
+            # edge difference, plus the number of contracted neighbors and the depth
+            # of v in the hierarchy to spread the contraction over the graph,
+            # estimated with shorter witness searches
+            outdated[v] = False
+            shortcuts = cls._shortcuts(adj, v, cls.SIMULATION_SETTLED_LIMIT)
+            return (
+                2 * (len(shortcuts) - len(adj[v]))
+                + deleted_neighbors[v]
+                + level[v]
+            )
+
+        q = [(priority(v), v) for v in range(V)]
+        heapq.heapify(q)
+        order = 0
+        while len(q) != 0:
+            (_, v) = heapq.heappop(q)
+            # lazy update, only the priorities of the neighbors of the contracted
+            # nodes are simulated again
+            if outdated[v]:
+                current = priority(v)
+                if len(q) != 0 and current > q[0][0]:
+                    heapq.heappush(q, (current, v))
+                    continue
+
+            shortcuts = cls._shortcuts(adj, v)
+            up[v] = [(u, w, middle) for u, (w, middle) in adj[v].items()]
+            for u in adj[v]:
+                del adj[u][v]
+                deleted_neighbors[u] += 1
+                level[u] = max(level[u], level[v] + 1)
+                outdated[u] = True
+            for u, x, w in shortcuts:
+                if x not in adj[u] or w < adj[u][x][0]:
+                    adj[u][x] = (w, v)
+                    adj[x][u] = (w, v)
+            adj[v] = {}
+            rank[v] = order
+            order += 1
+            if logger is not None and order % 1000 == 0:
+                logger.debug(f"Contracted {order}/{V} nodes")
+
+        up_indptr = [0]
+        up_indices = []
+        up_weights = []
+        up_middle = []
+        for v in range(V):
+            for u, w, middle in up[v]:
+                up_indices.append(u)
+                up_weights.append(w)
+                up_middle.append(middle)
+            up_indptr.append(len(up_indices))
+        return cls(rank, up_indptr, up_indices, up_weights, up_middle)
+
+    @classmethod
+    def _shortcuts(cls, adj, v, settled_limit=None):
+        """
+        Shortcuts (u, w, weight) needed to contract v from the remaining graph,
+        the witness searches settle at most settled_limit nodes
+        """
+        if settled_limit is None:
+            settled_limit = cls.WITNESS_SETTLED_LIMIT
+        neighbors = list(adj[v].items())
+        shortcuts = []
+        for i, (u, (wu, _)) in enumerate(neighbors):
+            targets = {x: wu + wx for x, (wx, _) in neighbors[i + 1 :]}
+            if len(targets) == 0:
+                continue
+            dist = cls._witness_search(
+                adj, u, v, max(targets.values()), targets, settled_limit
+            )
+            for x, w in targets.items():
+                if dist.get(x, float("inf")) > w:
+                    shortcuts.append((u, x, w))
+        return shortcuts
+
+    @classmethod
+    def _witness_search(cls, adj, source, avoid, limit, targets, settled_limit):
+        """
+        Bounded Dijkstra from source in the remaining graph without the node avoid,
+        stopped once all the targets are settled
+        """
+        dist = {source: 0}
+        q = [(0, source)]
+        settled = 0
+        remaining = len(targets)
+        while len(q) != 0 and settled < settled_limit:
+            (d, node) = heapq.heappop(q)
+            if d > dist[node]:
+                continue
+            if d > limit:
+                break
+            settled += 1
+            if node in targets:
+                remaining -= 1
+                if remaining == 0:
+                    break
+            for n, (w, _) in adj[node].items():
+                if n == avoid:
+                    continue
+                nd = d + w
+                if n not in dist or nd < dist[n]:
+                    dist[n] = nd
+                    heapq.heappush(q, (nd, n))
+        return dist
+
+    @classmethod
+    def load_or_build(cls, file_handler, graph, logger):
+        """
+        Load the hierarchy stored next to the instance, or build and save it
+        """
+        path = os.path.join(
+            file_handler.cache_path(), "contraction_hierarchy.npz"
+        )
+        stamp = file_handler.source_stamp()
+        try:
+            with np.load(path) as data:
+                if all(data[key] == stamp[key] for key in stamp):
+                    logger.debug(f"Contraction hierarchy loaded from {path}")
+                    return cls(
+                        data["rank"],
+                        data["up_indptr"],
+                        data["up_indices"],
+                        data["up_weights"],
+                        data["up_middle"],
+                    )
+        except (OSError, KeyError, ValueError):
+            pass
+
+        logger.info("Building the contraction hierarchy")
+        ch = cls.build(graph, logger)
+        logger.info(f"Contraction hierarchy built with {ch.shortcuts} shortcuts")
+        try:
+            os.makedirs(file_handler.cache_path(), exist_ok=True)
+            np.savez(
+                path,
+                rank=ch.rank,
+                up_indptr=ch.up_indptr,
+                up_indices=ch.up_indices,
+                up_weights=ch.up_weights,
+                up_middle=ch.up_middle,
+                **stamp,
+            )
+        except OSError:
+            pass
+        return ch
+
+    def query(self, start, goal):
+        """
+        Bidirectional upward Dijkstra between start and goal.
+        Return (cost, path, nodes settled per direction), cost is inf if goal cannot be reached
+        """
+        indptr = self._indptr
+        indices = self._indices
+        weights = self._weights
+        dist = [{start: 0}, {goal: 0}]
+        parents = [{start: None}, {goal: None}]
+        q = [[(0, start)], [(0, goal)]]
+        settled = [0, 0]
+        mu = float("inf")
+        meeting = None
+
+        while True:
+            # a direction is finished once its smallest key cannot improve mu
+            for direction in (0, 1):
+                if len(q[direction]) != 0 and q[direction][0][0] >= mu:
+                    q[direction] = []
+            if len(q[0]) == 0 and len(q[1]) == 0:
+                break
+            if len(q[1]) == 0 or (
+                len(q[0]) != 0 and q[0][0][0] <= q[1][0][0]
+            ):
+                direction = 0
+            else:
+                direction = 1
+
+            (d, node) = heapq.heappop(q[direction])
+            if d > dist[direction][node]:
+                continue
+            settled[direction] += 1
+            other = dist[1 - direction].get(node)
+            if other is not None and d + other < mu:
+                mu = d + other
+                meeting = node
+            for i in range(indptr[node], indptr[node + 1]):
+                n = indices[i]
+                nd = d + weights[i]
+                if n not in dist[direction] or nd < dist[direction][n]:
+                    dist[direction][n] = nd
+                    parents[direction][n] = node
+                    heapq.heappush(q[direction], (nd, n))
+
+        if meeting is None:
+            return float("inf"), [], settled
+
+        forward = self._build_path(parents[0], meeting)
+        backward = self._build_path(parents[1], meeting)
+        backward.reverse()
+        upward_path = forward + backward[1:]
+        path = [start]
+        for a, b in zip(upward_path[0::1], upward_path[1::1]):
+            self._unpack(a, b, path)
+        return mu, path, settled
+
+    @staticmethod
+    def _build_path(parents, node):
+        path = []
+        while node is not None:
+            path.append(node)
+            node = parents[node]
+        path.reverse()
+        return path
+
+    def _unpack(self, a, b, path):
+        """
+        Append to path the original nodes of the edge a-b, a excluded
+        """
+        if self._rank[a] < self._rank[b]:
+            middle = self._middle[(a, b)]
+        else:
+            middle = self._middle[(b, a)]
+        if middle < 0:
+            path.append(b)
+        else:
+            self._unpack(a, middle, path)
+            self._unpack(middle, b, path)
@@ -0,0 +1,169 @@
+import json
+import multiprocessing
+import os
+import tempfile
+
+import numpy as np
+
+from CSRGraph import CSRGraph
+
+try:
+    from multiprocessing import shared_memory
+except ImportError:  # Python < 3.8, the arrays are then copied to each worker
+    shared_memory = None
+
+# Per process state of the pool workers: the graph rebuilt on the shared CSR arrays,
+# the output matrix opened as a memory map and the shared memory blocks kept alive
+_graph = None
+_matrix = None
+_blocks = []
+
+
+def _share(array):
+    """
+    Copy an array into a new shared memory block, return the block and its description
+    """
+    block = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+    shared = np.ndarray(array.shape, dtype=array.dtype, buffer=block.buf)
+    shared[...] = array
+    return block, (block.name, array.shape, array.dtype.str)
+
+
+def _attach(description):
+    (name, shape, dtype) = description
+    block = shared_memory.SharedMemory(name=name)
+    _blocks.append(block)
+    return np.ndarray(shape, dtype=np.dtype(dtype), buffer=block.buf)
+
+
+def _init_worker(arrays, shared, path):
+    global _graph, _matrix
+    if shared:
+        arrays = [_attach(description) for description in arrays]
+    _graph = CSRGraph(*arrays)
+    _matrix = np.load(path, mmap_mode="r+")
+
+
+def _compute_rows(rows):
+    """
+    Run one Dijkstra per (row, source) pair and write the distances in the matrix
+    """
+    for (row, source) in rows:
+        _matrix[row] = _graph.sssp(source)
+    _matrix.flush()
+    return len(rows)
+
+
+def compute_distances(graph, sources, path=None, processes=1, dtype=np.float32):
+    """
+    Shortest distances from every source to every node of the CSRGraph, row i of the
+    result being the distances from sources[i] (inf if unreachable).
+    The rows are written in a memory mapped .npy file at path, a temporary file if path
+    is None, by a pool of processes that read the CSR arrays from shared memory.
+    Return the matrix opened read-only as a memory map, or loaded in memory without path.
+    """
+    sources = [int(source) for source in sources]
+    keep = path is not None
+    if not keep:
+        (fd, path) = tempfile.mkstemp(suffix=".npy")
+        os.close(fd)
+    matrix = np.lib.format.open_memmap(
+        path, mode="w+", dtype=dtype, shape=(len(sources), graph.V)
+    )
+    del matrix
+
+    tasks = list(enumerate(sources))
+    arrays = [graph.indptr, graph.indices, graph.weights]
+    try:
+        if processes == 1 or len(tasks) < 2:
+            _init_worker(arrays, False, path)
+            _compute_rows(tasks)
+        else:
+            # a few chunks per process balance the load without too many flushes
+            size = max(1, len(tasks) // (4 * processes))
+            chunks = [tasks[i : i + size] for i in range(0, len(tasks), size)]
+            blocks = []
+            shared = shared_memory is not None
+            if shared:
+                descriptions = []
+                for array in arrays:
+                    (block, description) = _share(np.ascontiguousarray(array))
+                    blocks.append(block)
+                    descriptions.append(description)
+                arrays = descriptions
+            try:
+                with multiprocessing.Pool(
+                    processes,
+                    initializer=_init_worker,
+                    initargs=(arrays, shared, path),
+                ) as pool:
+                    for _ in pool.imap_unordered(_compute_rows, chunks):
+                        pass
+            finally:
+                for block in blocks:
+                    block.close()
+                    block.unlink()
+    finally:
+        global _graph, _matrix
+        _graph = None
+        _matrix = None
+
+    if keep:
+        return np.load(path, mmap_mode="r")
+    matrix = np.load(path)
+    os.remove(path)
+    return matrix
+
+
+class DistanceTable:
+    """
+    Precomputed shortest distances from a list of sources to every node, stored next
+    to the instance as a float32 .npy matrix and opened as a read-only memory map,
+    so that it is computed once and shared by all the processes using the instance.
+    """
+
+    def __init__(self, sources, distances):
+        self.sources = list(sources)
+        self.distances = distances
+        self.rows = {source: i for i, source in enumerate(self.sources)}
+
+    @classmethod
+    def load_or_build(cls, file_handler, graph, name, sources, logger, processes=1):
+        """
+        Load the table called name stored next to the instance, or compute and save it.
+        sources defaults to every node (all pairs)
+        """
+        if sources is None:
+            sources = range(graph.V)
+        sources = [int(source) for source in sources]
+        cache = file_handler.cache_path()
+        path = os.path.join(cache, f"distances_{name}.npy")
+        meta_path = os.path.join(cache, f"distances_{name}.json")
+        meta = dict(file_handler.source_stamp(), sources=sources)
+        try:
+            with open(meta_path, "r") as f:
+                if json.load(f) == meta:
+                    logger.debug(f"Distance table loaded from {path}")
+                    return cls(sources, np.load(path, mmap_mode="r"))
+        except (OSError, ValueError):
+            pass
+
+        logger.info(
+            f"Computing the distances from {len(sources)} sources with {processes} processes"
+        )
+        os.makedirs(cache, exist_ok=True)
+        distances = compute_distances(graph, sources, path, processes)
+        with open(meta_path, "w") as f:
+            json.dump(meta, f)
+        return cls(sources, distances)
+
+    def distance(self, source, node):
+        return float(self.distances[self.rows[source], node])
+
+    def heuristic_to(self, goal):
+        """
+        Distances between every node and goal, shrunk by the float32 rounding error so
+        that they remain lower bounds. Needs goal among the sources (the graph is undirected)
+        """
+        row = np.asarray(self.distances[self.rows[goal]], dtype=np.float64)
+        return row * (1 - 2 * np.finfo(np.float32).eps)
@@ -1,4 +1,15 @@
-import math
+import json
+import os
+
+import numpy as np
+
+from CSRGraph import CSRGraph
+
+# Version of the binary cache layout, bump it when the cached arrays change
+CACHE_VERSION = 1
+CACHE_ARRAYS = ["coords", "indptr", "indices", "weights"]
+# Number of lines formatted at once by the streaming writer
+WRITE_CHUNK = 100000
 
 
 class FileHandler:
@@ -19,69 +30,190 @@ class FileHandler:
         node ID of the destination node = 1
     """
 
-    def read(self):
-        E = 0
-        V = 0
-        edges = []
-        edge_index = {}
+    def read(self, use_cache=True):
+        """
+        Read the instance into the Python containers used by the networkx backend.
+        They are built from the arrays of read_csr(), so the text file is only parsed
+        when the binary cache is missing or stale. Each edge is listed once, with
+        source < destination, sorted by source.
+        """
+        E, V, vertices, graph = self.read_csr(use_cache)
+        src = np.repeat(np.arange(V), np.diff(graph.indptr))
+        once = src < graph.indices
+        edges = [
+            (v1, v2, w, "black")
+            for v1, v2, w in zip(
+                src[once].tolist(),
+                graph.indices[once].tolist(),
+                graph.weights[once].tolist(),
+            )
+        ]
+        edge_index = {(v1, v2): i for i, (v1, v2, _, _) in enumerate(edges)}
+
         neighbors = {}
-        vertices = {}
-        n_vertices = -1
-        with open(self.file_name, "r") as f:
-            for line in f.readlines():
-                element = line.split()
-                if n_vertices == -1:
-                    n_vertices = int(element[0])
-                    V = n_vertices
-                elif n_vertices != 0:
-                    vertices[int(element[0])] = (
-                        int(element[1]),
-                        int(element[2]),
-                    )
-                    n_vertices -= 1
-                elif n_vertices == 0:
-                    v1 = int(element[0])
-                    v2 = int(element[1])
-                    w = round(
-                        math.sqrt(
-                            (vertices[v2][1] - vertices[v1][1]) ** 2
-                            + (vertices[v2][0] - vertices[v1][0]) ** 2
-                        ),
-                        2,
-                    )
-                    edges.append((v1, v2, w, "black"))
-                    edge_index[(v1, v2)] = E
-
-                    if v1 == 0:
-                        neighbors.setdefault(v1, ([], "green"))[0].append(v2)
-                    elif v1 == 1:
-                        neighbors.setdefault(v1, ([], "red"))[0].append(v2)
-                    else:
-                        neighbors.setdefault(v1, ([], "grey"))[0].append(v2)
-
-                    if v2 == 0:
-                        neighbors.setdefault(v2, ([], "green"))[0].append(v1)
-                    elif v2 == 1:
-                        neighbors.setdefault(v2, ([], "red"))[0].append(v1)
-                    else:
-                        neighbors.setdefault(v2, ([], "grey"))[0].append(v1)
-
-                    E += 1
+        indptr = graph.indptr.tolist()
+        indices = graph.indices.tolist()
+        for v in range(V):
+            if indptr[v] == indptr[v + 1]:
+                continue
+            if v == 0:
+                color = "green"
+            elif v == 1:
+                color = "red"
+            else:
+                color = "grey"
+            neighbors[v] = (indices[indptr[v] : indptr[v + 1]], color)
         return E, V, vertices, edges, edge_index, neighbors
 
+    def read_csr(self, use_cache=True):
+        """
+        Read the instance into a compact CSR adjacency, read() builds its Python
+        containers from it.
+        The arrays are cached in binary form next to the instance and reused as long as
+        the size and modification time of the instance file do not change.
+        """
+        if use_cache:
+            cached = self.load_cache()
+            if cached is not None:
+                return cached
+
+        with open(self.file_name, "r") as f:
+            values = np.array(f.read().split(), dtype=np.int64)
+        V = int(values[0])
+        vertex_rows = values[1 : 1 + 3 * V].reshape(V, 3)
+        coords = np.zeros((V, 2), dtype=np.int64)
+        coords[vertex_rows[:, 0]] = vertex_rows[:, 1:]
+        edge_rows = values[1 + 3 * V :].reshape(-1, 2)
+        graph = CSRGraph.from_edges(
+            V,
+            edge_rows[:, 0],
+            edge_rows[:, 1],
+            self.edge_weights(coords, edge_rows[:, 0], edge_rows[:, 1]),
+        )
+        if use_cache:
+            self.write_cache(coords, graph.indptr, graph.indices, graph.weights)
+        return graph.E, V, self.coords_to_vertices(coords), graph
+
+    @staticmethod
+    def edge_weights(coords, src, dst):
+        """
+        Euclidean length of the edges rounded to 2 decimals
+        """
+        delta = coords[dst] - coords[src]
+        # Python round() keeps the weights identical to the ones of read()
+        return [round(w, 2) for w in np.sqrt((delta ** 2).sum(axis=1)).tolist()]
+
+    @staticmethod
+    def coords_to_vertices(coords):
+        return {i: (x, y) for i, (x, y) in enumerate(coords.tolist())}
+
+    def cache_path(self):
+        """
+        Directory holding the binary form of the instance
+        """
+        return str(self.file_name) + ".cache"
+
+    def source_stamp(self):
+        stat = os.stat(self.file_name)
+        return {
+            "version": CACHE_VERSION,
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+        }
+
+    def load_cache(self):
+        """
+        Load the cached arrays as read-only memory maps,
+        None if the cache is missing or stale
+        """
+        cache = self.cache_path()
+        try:
+            with open(os.path.join(cache, "meta.json"), "r") as f:
+                meta = json.load(f)
+            if meta != self.source_stamp():
+                return None
+            arrays = {
+                name: np.load(
+                    os.path.join(cache, name + ".npy"), mmap_mode="r"
+                )
+                for name in CACHE_ARRAYS
+            }
+        except (OSError, ValueError):
+            return None
+        graph = CSRGraph(arrays["indptr"], arrays["indices"], arrays["weights"])
+        V = len(arrays["coords"])
+        return graph.E, V, self.coords_to_vertices(arrays["coords"]), graph
+
+    def write_cache(self, coords, indptr, indices, weights):
+        cache = self.cache_path()
+        arrays = {
+            "coords": coords,
+            "indptr": indptr,
+            "indices": indices,
+            "weights": weights,
+        }
+        try:
+            os.makedirs(cache, exist_ok=True)
+            for name in CACHE_ARRAYS:
+                np.save(os.path.join(cache, name + ".npy"), arrays[name])
+            # The metadata is written last,
+            # an interrupted write leaves a cache that is never used
+            with open(os.path.join(cache, "meta.json"), "w") as f:
+                json.dump(self.source_stamp(), f)
+        except OSError:
+            # e.g. read-only dataset folder,
+            # the text file is simply parsed again next time
+            pass
+
     def write(self, V, vertices, edges):
-        to_write = str(V) + "\n"
-        for i in vertices:
-            current_pos = vertices[i]
-            line = (
-                str(i) + " " + str(current_pos[0]) + " " + str(current_pos[1])
+        """
+        Write an instance, the lines are streamed to the file instead of being
+        concatenated in memory. edges can be any iterable of (source, destination, ...)
+        """
+        with open(self.file_name, "w") as f:
+            f.write(str(V) + "\n")
+            f.writelines(
+                "{} {} {}\n".format(i, vertices[i][0], vertices[i][1])
+                for i in vertices
             )
-            to_write += line + "\n"
+            f.writelines("{} {}\n".format(e[0], e[1]) for e in edges)
 
-        for e in edges:
-            line = str(e[0]) + " " + str(e[1])
-            to_write += line + "\n"
+    def write_arrays(self, coords, src, dst):
+        """
+        Write an instance given as arrays: coords[i] is the (x, y) position of node i
+        and the edges are (src[k], dst[k]). The text is written by chunks of
+        WRITE_CHUNK lines, then the binary form is saved in the cache so that it is
+        never parsed again.
+        Return the number of edges
+        """
+        coords = np.asarray(coords, dtype=np.int64)
+        src = np.asarray(src, dtype=np.int64)
+        dst = np.asarray(dst, dtype=np.int64)
+        V = len(coords)
+        with open(self.file_name, "w") as f:
+            f.write(str(V) + "\n")
+            for begin in range(0, V, WRITE_CHUNK):
+                rows = coords[begin : begin + WRITE_CHUNK].tolist()
+                f.write(
+                    "".join(
+                        "{} {} {}\n".format(begin + i, x, y)
+                        for i, (x, y) in enumerate(rows)
+                    )
+                )
+            for begin in range(0, len(src), WRITE_CHUNK):
+                pairs = zip(
+                    src[begin : begin + WRITE_CHUNK].tolist(),
+                    dst[begin : begin + WRITE_CHUNK].tolist(),
+                )
+                f.write("".join("{} {}\n".format(a, b) for a, b in pairs))
 
-        f = open(self.file_name, "w")
-        f.write(to_write)
-        f.close()
+        (indptr, indices, weights) = CSRGraph.csr_arrays(
+            V, src, dst, self.edge_weights(coords, src, dst)
+        )
+        self.write_cache(
+            coords,
+            indptr,
+            indices.astype(np.int32),
+            weights.astype(np.float64),
+        )
+        return len(src)
@@ -11,55 +11,117 @@ COLOR_BIDIRECTIONAL = "#a834eb"
 COLOR_CURRENT = "#FF33ff"  # "#ff9d00"
 COLOR_SHORT_LIST = "#ffff00"
 
+# Above this number of nodes the graph is drawn in decimated mode:
+# no labels, small nodes and thin edges
+DECIMATE_NODES = 300
+
 
 class GUI:
     """
-    Class used for the GUI of the project
+    Class used for the GUI of the project.
+    The nodes and edges are drawn once, each step only updates their colors.
     """
 
     def __init__(
-        self, history, graph, nodes_pos, is_bidirectional, name, logger
+        self,
+        history,
+        graph,
+        nodes_pos,
+        is_bidirectional,
+        name,
+        logger,
+        start=0,
+        goal=1,
+        decimate=None,
     ):
         self.history = history
         self.is_bidirectional = is_bidirectional
         self.G = graph
         self.nodes_pos = nodes_pos
-        self.nodes_pos_without_goals = b = {
-            x: self.nodes_pos[x] for x in self.nodes_pos if x not in [0, 1]
-        }
+        self.start = start
+        self.goal = goal
         self.name = name
         self.logger = logger
         self.index = 0
+        if decimate is None:
+            decimate = self.G.number_of_nodes() > DECIMATE_NODES
+        self.decimate = decimate
 
-        self.edges_index = list(self.G.edges())
-        self.node_labels = {x: "{}".format(x) for x in list(self.G.nodes())}
-        self.node_labels[0] = "start"
-        self.node_labels[1] = "goal"
-
-    def plotOneState(self, state, iteration, revState=[]):
+        # Position of each node and edge in the color arrays of the drawn artists
+        self.goals = [self.start, self.goal]
+        self.other_nodes = [
+            x for x in self.G.nodes() if x not in self.goals
+        ]
+        self.nodes_index = {x: i for i, x in enumerate(self.other_nodes)}
+        self.edges = list(self.G.edges())
+        self.edges_index = {}
+        for i, (a, b) in enumerate(self.edges):
+            self.edges_index[(a, b)] = i
+            self.edges_index[(b, a)] = i
 
-        # revstate is filled only when bidirectionnal search is performed
-        candidates = state[1:] + revState
+        self.node_labels = {x: "{}".format(x) for x in list(self.G.nodes())}
+        self.node_labels[self.start] = "start"
+        self.node_labels[self.goal] = "goal"
 
-        # Set title, texts and legends
-        plt.clf()
-        plt.cla()
-        ax = plt.gca()
-        ax.set_title(f"{self.name}: iteration {iteration}")
-        # Compute current path cost
-        (score, _, path) = state[0]
-        path_cost = 0
-        for i, k in zip(path[0::1], path[1::1]):
-            path_cost += self.G.edges[i, k]["weight"]
-        heuristic_cost = score - path_cost
-        final = path[-1] == 1 and path[0] == 0
+        self.figure = None
 
-        plt.gcf().text(
-            0.3,
-            0.15,
-            f"Heuristic + path cost = {heuristic_cost:.2f} + {path_cost:.2f} = {score:.2f}",
-            fontsize=11,
+    def drawGraph(self):
+        """
+        Create the artists of the graph, they are kept for the whole replay
+        """
+        self.figure = plt.gcf()
+        self.ax = plt.gca()
+        plt.subplots_adjust(bottom=0.2)
+        node_size = 15 if self.decimate else 300
+        self.edges_artist = nx.draw_networkx_edges(
+            self.G,
+            self.nodes_pos,
+            edgelist=self.edges,
+            edge_color="black",
+            width=0.5 if self.decimate else 1.0,
+            ax=self.ax,
+        )
+        self.nodes_artist = nx.draw_networkx_nodes(
+            self.G,
+            self.nodes_pos,
+            nodelist=self.other_nodes,
+            node_color="grey",
+            node_size=node_size,
+            ax=self.ax,
+        )
+        # start and goal nodes with star shape
+        self.goals_artist = nx.draw_networkx_nodes(
+            self.G,
+            self.nodes_pos,
+            nodelist=self.goals,
+            node_color=[COLOR_SRC, COLOR_DST],
+            node_shape="*",
+            node_size=node_size + 100,
+            ax=self.ax,
         )
+        if not self.decimate:
+            nx.draw_networkx_labels(
+                self.G,
+                self.nodes_pos,
+                labels=self.node_labels,
+                font_size=10,
+                ax=self.ax,
+            )
+            nx.draw_networkx_edge_labels(
+                self.G,
+                self.nodes_pos,
+                edge_labels=nx.get_edge_attributes(self.G, "weight"),
+                font_size=6,
+                ax=self.ax,
+            )
+        self.ax.set_axis_off()
+        self.cost_text = self.figure.text(0.3, 0.15, "", fontsize=11)
+        self.legend_texts = []
+
+    def drawLegend(self, final):
+        for text in self.legend_texts:
+            text.remove()
+        self.legend_texts = []
 
         legend_list = [
             ("Current", COLOR_CURRENT),
@@ -83,24 +145,51 @@ class GUI:
                 continue
             if final and "Path" in text:
                 continue
-            plt.gcf().text(
-                x_pos, y_pos, text, color="k", fontsize=10, backgroundcolor=col
+            self.legend_texts.append(
+                self.figure.text(
+                    x_pos,
+                    y_pos,
+                    text,
+                    color="k",
+                    fontsize=10,
+                    backgroundcolor=col,
+                )
             )
             x_pos += x_step
 
+    def plotOneState(self, state, iteration, revState=[]):
+
+        if self.figure is None:
+            self.drawGraph()
+
+        # revstate is filled only when bidirectionnal search is performed
+        candidates = state[1:] + revState
+
+        # Set title, texts and legends
+        self.ax.set_title(f"{self.name}: iteration {iteration}")
+        # Compute current path cost
+        (score, _, path) = state[0]
+        path_cost = 0
+        for i, k in zip(path[0::1], path[1::1]):
+            path_cost += self.G.edges[i, k]["weight"]
+        heuristic_cost = score - path_cost
+        final = path[-1] == self.goal and path[0] == self.start
+
+        self.cost_text.set_text(
+            f"Heuristic + path cost = {heuristic_cost:.2f} + {path_cost:.2f} = {score:.2f}"
+        )
+        self.drawLegend(final)
+
         # Fill nodes and edges color wrt current state
-        edges_color = ["black" for _ in self.G.edges()]
-        nodes_color = ["grey" for _ in self.G.nodes()]
+        edges_color = ["black" for _ in self.edges]
+        nodes_color = {}
 
         # candidates nodes in blue
         for (nscore, n, path) in candidates:
             for i in path:
                 nodes_color[i] = COLOR_SHORT_LIST
             for i, k in zip(path[0::1], path[1::1]):
-                try:
-                    edges_color[self.edges_index.index((i, k))] = COLOR_EXPLORED
-                except ValueError:
-                    edges_color[self.edges_index.index((k, i))] = COLOR_EXPLORED
+                edges_color[self.edges_index[(i, k)]] = COLOR_EXPLORED
             nodes_color[n] = COLOR_NEIGHBOURED
 
         # current
@@ -110,47 +199,30 @@ class GUI:
             for i in path:
                 nodes_color[i] = COLOR_DST if final else COLOR_PATH
             for i, k in zip(path[0::1], path[1::1]):
-                try:
-                    edges_color[self.edges_index.index((i, k))] = (
-                        COLOR_DST if final else COLOR_PATH
-                    )
-                except ValueError:
-                    edges_color[self.edges_index.index((k, i))] = (
-                        COLOR_DST if final else COLOR_PATH
-                    )
+                edges_color[self.edges_index[(i, k)]] = (
+                    COLOR_DST if final else COLOR_PATH
+                )
             nodes_color[current_node] = (
                 COLOR_DST if final else current_colors[ix]
             )
 
-        # First draw start and goal nodes with star shape
-        nx.draw_networkx_nodes(
-            self.G,
-            self.nodes_pos,
-            nodelist=[0, 1],
-            node_color=nodes_color[:2],
-            node_shape="*",
-            node_size=400,
+        # Only the color arrays of the artists are updated
+        self.nodes_artist.set_facecolor(
+            [nodes_color.get(x, "grey") for x in self.other_nodes]
         )
-        # Draw all nodes and edges
-        nx.draw(
-            self.G,
-            self.nodes_pos,
-            with_labels=True,
-            labels=self.node_labels,
-            font_size=10,
-            node_color=nodes_color[2:],
-            nodelist=self.nodes_pos_without_goals,
-            edge_color=edges_color,
-        )
-        # Add edges labels
-        nx.draw_networkx_edge_labels(
-            self.G,
-            self.nodes_pos,
-            edge_labels=nx.get_edge_attributes(self.G, "weight"),
-            font_size=6,
+        self.goals_artist.set_facecolor(
+            [
+                nodes_color.get(self.start, COLOR_SRC),
+                nodes_color.get(self.goal, COLOR_DST),
+            ]
         )
-
-        plt.subplots_adjust(bottom=0.2)
+        self.edges_artist.set_color(edges_color)
+        if self.decimate:
+            # highlighted edges are drawn thicker so that they remain visible
+            self.edges_artist.set_linewidth(
+                [0.5 if c == "black" else 2.0 for c in edges_color]
+            )
+        self.figure.canvas.draw_idle()
 
     def show(self):
         self.showButtons()
@@ -162,33 +234,35 @@ class GUI:
                 if self.index + 1 < len(self.history)
                 else self.index - 1
             )
-            iteration = self.index - 1 if self.index > 0 else 0
             self.plotOneState(
                 self.history[self.index],
-                iteration=iteration,
+                iteration=self.history.iteration(self.index),
                 revState=self.history[other_index],
             )
         else:
-            self.plotOneState(self.history[self.index], iteration=self.index)
+            self.plotOneState(
+                self.history[self.index],
+                iteration=self.history.iteration(self.index),
+            )
 
     def showButtons(self):
         def next(event):
             self.index += 1
             self.index = min(self.index, len(self.history) - 1)
-            self.showButtons()
+            self.plotIndex()
 
         def back(event):
             self.index -= 1
             self.index = max(self.index, 0)
-            self.showButtons()
+            self.plotIndex()
 
         def end(event):
             self.index = len(self.history) - 1
-            self.showButtons()
+            self.plotIndex()
 
         def reset(event):
             self.index = 0
-            self.showButtons()
+            self.plotIndex()
 
         self.plotIndex()
         self.button_reset = widgets.Button(
@@ -0,0 +1,204 @@
+from FileHandler import FileHandler
+import argparse
+import logging
+import math
+import time
+
+import numpy as np
+
+# Kinds of instances the generator can build
+GRAPH_KINDS = ["geometric", "grid", "delaunay"]
+
+# Average distance in pixels between neighboring nodes
+SPACING = 10
+
+# Forward cell offsets, each pair of neighboring cells is visited once
+_OFFSETS = [(0, 0), (1, -1), (1, 0), (1, 1), (0, 1)]
+
+
+def random_geometric(n, seed=0, degree=6, chunk=200000):
+    """
+    n nodes placed uniformly at random, two nodes are linked when they are closer
+    than the radius giving degree neighbors on average. The pairs are found with a grid
+    of cells as large as the radius, by chunks of nodes to bound the memory.
+    Return (coords, src, dst)
+    """
+    rng = np.random.default_rng(seed)
+    side = SPACING * math.sqrt(n)
+    coords = rng.integers(0, int(side) + 1, size=(n, 2))
+    radius = math.sqrt(degree / (math.pi * n)) * side
+
+    cells = (coords // radius).astype(np.int64)
+    width = int(cells[:, 1].max()) + 3
+    # a border of empty cells avoids to check the neighbors of the border cells
+    cell_id = (cells[:, 0] + 1) * width + cells[:, 1] + 1
+    order = np.argsort(cell_id, kind="stable")
+    sorted_id = cell_id[order]
+    n_cells = (int(cells[:, 0].max()) + 3) * width
+    cell_start = np.zeros(n_cells + 1, dtype=np.int64)
+    np.cumsum(np.bincount(sorted_id, minlength=n_cells), out=cell_start[1:])
+
+    src = []
+    dst = []
+    for begin in range(0, n, chunk):
+        nodes = np.arange(begin, min(begin + chunk, n))
+        for (dx, dy) in _OFFSETS:
+            other = sorted_id[nodes] + dx * width + dy
+            counts = cell_start[other + 1] - cell_start[other]
+            a = np.repeat(nodes, counts)
+            # position of each candidate inside its cell
+            within = np.arange(len(a)) - np.repeat(np.cumsum(counts) - counts, counts)
+            b = np.repeat(cell_start[other], counts) + within
+            if (dx, dy) == (0, 0):
+                keep = b > a
+                a = a[keep]
+                b = b[keep]
+            (u, v) = (order[a], order[b])
+            close = ((coords[u] - coords[v]) ** 2).sum(axis=1) <= radius ** 2
+            src.append(u[close])
+            dst.append(v[close])
+    return coords, np.concatenate(src), np.concatenate(dst)
+
+
+def grid_obstacles(n, seed=0, obstacles=0.2):
+    """
+    Square grid of about n nodes linked to their 4 neighbors, from which rectangular
+    obstacles are removed until the given ratio of the nodes is gone.
+    Return (coords, src, dst)
+    """
+    rng = np.random.default_rng(seed)
+    side = max(2, int(math.ceil(math.sqrt(n / (1 - obstacles)))))
+    free = np.ones((side, side), dtype=bool)
+    target = int(obstacles * side * side)
+    while side * side - np.count_nonzero(free) < target:
+        (w, h) = rng.integers(1, max(2, side // 10) + 1, size=2)
+        (x, y) = rng.integers(0, side, size=2)
+        free[x : x + w, y : y + h] = False
+
+    ids = np.full((side, side), -1, dtype=np.int64)
+    ids[free] = np.arange(np.count_nonzero(free))
+    (x, y) = np.nonzero(free)
+    coords = np.stack([x, y], axis=1) * SPACING
+
+    src = []
+    dst = []
+    for (a, b) in ((ids[:-1, :], ids[1:, :]), (ids[:, :-1], ids[:, 1:])):
+        keep = (a >= 0) & (b >= 0)
+        src.append(a[keep])
+        dst.append(b[keep])
+    return coords, np.concatenate(src), np.concatenate(dst)
+
+
+def delaunay_like(n, seed=0):
+    """
+    Planar triangulation of about n nodes: one node at a random position in the middle
+    of each cell of a square grid, linked to its horizontal and vertical neighbors,
+    and each cell of 4 nodes split by its shorter diagonal as a Delaunay triangulation would.
+    Return (coords, src, dst)
+    """
+    rng = np.random.default_rng(seed)
+    side = max(2, int(math.ceil(math.sqrt(n))))
+    (x, y) = np.meshgrid(np.arange(side), np.arange(side), indexing="ij")
+    jitter = rng.uniform(0.25, 0.75, size=(side, side, 2))
+    coords = (
+        (np.stack([x, y], axis=2) + jitter) * SPACING
+    ).round().astype(np.int64).reshape(-1, 2)
+    ids = np.arange(side * side).reshape(side, side)
+
+    src = [ids[:-1, :].ravel(), ids[:, :-1].ravel()]
+    dst = [ids[1:, :].ravel(), ids[:, 1:].ravel()]
+    # the two diagonals of each cell of 4 nodes
+    a = ids[:-1, :-1].ravel()
+    b = ids[1:, 1:].ravel()
+    c = ids[1:, :-1].ravel()
+    d = ids[:-1, 1:].ravel()
+    first = ((coords[a] - coords[b]) ** 2).sum(axis=1)
+    second = ((coords[c] - coords[d]) ** 2).sum(axis=1)
+    shorter = first <= second
+    src.append(np.where(shorter, a, c))
+    dst.append(np.where(shorter, b, d))
+    return coords, np.concatenate(src), np.concatenate(dst)
+
+
+def place_start_goal(coords, src, dst):
+    """
+    Renumber the nodes so that the start (0) and the destination (1) are the nodes
+    closest to two opposite corners of the instance
+    """
+    low = coords.min(axis=0)
+    high = coords.max(axis=0)
+    start = int(np.argmin(((coords - low) ** 2).sum(axis=1)))
+    goal = int(np.argmin(((coords - high) ** 2).sum(axis=1)))
+    # swap start with 0 and goal with 1
+    permutation = np.arange(len(coords))
+    for (node, target) in ((start, 0), (goal, 1)):
+        position = int(np.nonzero(permutation == node)[0][0])
+        permutation[[target, position]] = permutation[[position, target]]
+    new_id = np.empty_like(permutation)
+    new_id[permutation] = np.arange(len(coords))
+    return coords[permutation], new_id[src], new_id[dst]
+
+
+def generate(kind, n, seed=0, **options):
+    """
+    Return (coords, src, dst) of an instance of the given kind, one of GRAPH_KINDS
+    """
+    if kind == "geometric":
+        instance = random_geometric(n, seed, **options)
+    elif kind == "grid":
+        instance = grid_obstacles(n, seed, **options)
+    else:
+        instance = delaunay_like(n, seed)
+    return place_start_goal(*instance)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Generate instances for the shortest path search"
+    )
+    parser.add_argument("kind", type=str, choices=GRAPH_KINDS)
+    parser.add_argument(
+        "--nodes", type=int, help="Approximate number of nodes", default=10000
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--degree",
+        type=float,
+        help="Average degree of the geometric graphs",
+        default=6,
+    )
+    parser.add_argument(
+        "--obstacles",
+        type=float,
+        help="Ratio of the grid covered by obstacles",
+        default=0.2,
+    )
+    parser.add_argument(
+        "--output",
+        type=str,
+        help="Instance file, the binary form is written in OUTPUT.cache",
+        required=True,
+    )
+    args = parser.parse_args()
+
+    logging.basicConfig(format="[%(levelname)s] : %(message)s")
+    logger = logging.getLogger("shortest-path-generator")
+    logger.setLevel("INFO")
+
+    options = {}
+    if args.kind == "geometric":
+        options["degree"] = args.degree
+    elif args.kind == "grid":
+        options["obstacles"] = args.obstacles
+    start = time.time()
+    (coords, src, dst) = generate(args.kind, args.nodes, args.seed, **options)
+    logger.info(
+        f"{len(coords)} nodes and {len(src)} edges generated in {time.time() - start:.2f}s"
+    )
+    start = time.time()
+    FileHandler(args.output).write_arrays(coords, src, dst)
+    logger.info(f"Instance written to {args.output} in {time.time() - start:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
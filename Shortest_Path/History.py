@@ -0,0 +1,161 @@
+from collections import Counter
+
+RECORD_MODES = ["none", "sampled", "full"]
+
+
+class History:
+    """
+    Search history replayed by the GUI, one frame per recorded iteration.
+    A frame is the list of the (score, node, path) states of the priority queue,
+    its first state is the one expanded at this iteration and the others are sorted.
+
+    Modes:
+        none     nothing is recorded
+        sampled  one iteration out of `every` is recorded, frames are stored as
+                 differences with the previous recorded frame, and `every` is doubled
+                 whenever the stored states exceed `budget`
+        full     every iteration is recorded
+    """
+
+    # In sampled mode a complete frame is stored every KEYFRAME_INTERVAL frames,
+    # so that a random access only has to replay a few differences.
+    KEYFRAME_INTERVAL = 32
+
+    def __init__(self, mode="full", every=10, budget=1000000, group=1):
+        self.mode = mode
+        self.initial_every = max(1, every)
+        self.budget = budget
+        # Number of consecutive iterations kept together, the bidirectional search
+        # alternates directions so the GUI needs both frames of a pair.
+        self.group = group
+        self.clear()
+
+    def clear(self):
+        """
+        Drop all the recorded frames
+        """
+        self.every = self.initial_every
+        self._frames = []
+        self._iterations = []
+        self._forced = []
+        self._size = 0
+        # Last reconstructed frame, makes sequential replay in the GUI cheap
+        self._cache_index = None
+        self._cache_counter = None
+
+    def record(self, iteration, q, convert=None, force=False):
+        """
+        Record the queue q at the given iteration if the mode asks for it.
+        convert transforms the queue into a frame, default is a sorted copy.
+        """
+        if self.mode == "none":
+            return
+        if (
+            self.mode == "sampled"
+            and not force
+            and (iteration // self.group) % self.every != 0
+        ):
+            return
+        frame = convert(q) if convert is not None else sorted(q)
+        if self.mode == "full":
+            self._frames.append(frame)
+            self._iterations.append(iteration)
+            return
+
+        states = [(f, node, tuple(path)) for (f, node, path) in frame]
+        self._append_sampled(
+            states[0] if states else None, states[1:], iteration, force
+        )
+        if self._size > self.budget:
+            self._thin()
+
+    def _append_sampled(self, head, states, iteration, force, previous=None):
+        current = Counter(states)
+        if len(self._frames) % self.KEYFRAME_INTERVAL == 0:
+            self._frames.append((head, states, None))
+            self._size += len(states)
+        else:
+            if previous is None:
+                previous = self._counter(len(self._frames) - 1)
+            removed = list((previous - current).elements())
+            added = list((current - previous).elements())
+            self._frames.append((head, added, removed))
+            self._size += len(added) + len(removed)
+        self._iterations.append(iteration)
+        self._forced.append(force)
+        self._cache_index = len(self._frames) - 1
+        self._cache_counter = current
+
+    def _thin(self):
+        """
+        Double the sampling interval and drop the frames that do not fit it anymore
+        """
+        self.every *= 2
+        frames = self._frames
+        iterations = self._iterations
+        forced = self._forced
+        self._frames = []
+        self._iterations = []
+        self._forced = []
+        self._size = 0
+
+        counter = Counter()
+        kept = None
+        for (head, states, removed), iteration, force in zip(
+            frames, iterations, forced
+        ):
+            if removed is None:
+                counter = Counter(states)
+            else:
+                counter.update(states)
+                counter.subtract(removed)
+                counter = +counter
+            if force or (iteration // self.group) % self.every == 0:
+                self._append_sampled(
+                    head, list(counter.elements()), iteration, force, kept
+                )
+                kept = counter.copy()
+
+    def _counter(self, index):
+        """
+        Rebuild the multiset of states of a stored sampled frame
+        """
+        if self._cache_index == index:
+            return self._cache_counter
+        if self._cache_index is not None and self._cache_index < index:
+            start = self._cache_index + 1
+            counter = self._cache_counter.copy()
+        else:
+            start = index - index % self.KEYFRAME_INTERVAL
+            counter = Counter()
+        for i in range(start, index + 1):
+            _, states, removed = self._frames[i]
+            if removed is None:
+                counter = Counter(states)
+            else:
+                counter.update(states)
+                counter.subtract(removed)
+                counter = +counter
+        self._cache_index = index
+        self._cache_counter = counter
+        return counter
+
+    def iteration(self, index):
+        """
+        Return the search iteration of the frame at the given index
+        """
+        return self._iterations[index]
+
+    def __len__(self):
+        return len(self._frames)
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += len(self._frames)
+        if self.mode == "full":
+            return self._frames[index]
+        head = self._frames[index][0]
+        states = sorted(self._counter(index).elements())
+        if head is not None:
+            states.insert(0, head)
+        return [(f, node, list(path)) for (f, node, path) in states]
@@ -0,0 +1,142 @@
+import heapq
+import json
+from time import perf_counter_ns
+
+# Timed operations of the search, the rest of the run time is reported as "other"
+PHASES = ["heuristic", "push", "pop", "neighbors", "history"]
+
+
+class Instrumentation:
+    """
+    Counters and timers of the search internals, given to Algorithm with instrumentation=.
+    attach() replaces the methods used by the searches (heap push and pop, neighbors,
+    heuristic_to, history recording) by counting and timed wrappers on that Algorithm
+    only, so a run without instrumentation executes the plain code and pays nothing.
+    At the end of each run a JSON report is appended to output (one object per line),
+    or logged when output is None.
+
+    Counters:
+        pushes           entries pushed in the open lists
+        pops             entries popped from the open lists
+        stale_pops       popped entries of nodes already expanded, skipped
+        relaxations      edges scanned from the expanded nodes
+        heuristic_evals  heuristic values computed, one per node for each goal
+    """
+
+    def __init__(self, output=None):
+        self.output = output
+        self._written = False
+        self.counters = {
+            "pushes": 0,
+            "pops": 0,
+            "relaxations": 0,
+            "heuristic_evals": 0,
+        }
+        self.times = {phase: 0 for phase in PHASES}
+        self._start = perf_counter_ns()
+
+    def clear(self):
+        """
+        Reset the counters and timers, called at the beginning of each run
+        """
+        for counter in self.counters:
+            self.counters[counter] = 0
+        for phase in self.times:
+            self.times[phase] = 0
+        self._start = perf_counter_ns()
+
+    def _timed(self, phase, counter, function):
+        """
+        Wrap function so that each call adds its duration to phase and 1 to counter
+        """
+        times = self.times
+        counters = self.counters
+
+        def timed(*args, **kwargs):
+            begin = perf_counter_ns()
+            result = function(*args, **kwargs)
+            times[phase] += perf_counter_ns() - begin
+            if counter is not None:
+                counters[counter] += 1
+            return result
+
+        return timed
+
+    def attach(self, algorithm):
+        """
+        Instrument the searches of algorithm
+        """
+        algorithm.heappush = self._timed("push", "pushes", heapq.heappush)
+        algorithm.heappop = self._timed("pop", "pops", heapq.heappop)
+        algorithm.history.record = self._timed(
+            "history", None, algorithm.history.record
+        )
+
+        make_queue = algorithm.make_queue
+
+        def instrumented_queue(kind):
+            q = make_queue(kind)
+            q.push = self._timed("push", "pushes", q.push)
+            q.pop = self._timed("pop", "pops", q.pop)
+            return q
+
+        algorithm.make_queue = instrumented_queue
+
+        neighbors = algorithm.neighbors
+
+        def instrumented_neighbors(node):
+            # the pairs are listed here so that the graph lookups are timed
+            begin = perf_counter_ns()
+            pairs = list(neighbors(node))
+            self.times["neighbors"] += perf_counter_ns() - begin
+            self.counters["relaxations"] += len(pairs)
+            return pairs
+
+        algorithm.neighbors = instrumented_neighbors
+
+        heuristic_to = algorithm.heuristic_to
+
+        def instrumented_heuristic_to(goal):
+            begin = perf_counter_ns()
+            h = heuristic_to(goal)
+            self.times["heuristic"] += perf_counter_ns() - begin
+            self.counters["heuristic_evals"] += len(h)
+            return h
+
+        algorithm.heuristic_to = instrumented_heuristic_to
+
+    def report(self, algorithm):
+        """
+        Return the counters and timers of the run as a dictionary
+        """
+        total = perf_counter_ns() - self._start
+        counters = dict(self.counters)
+        # with the path copying search (solve) every popped entry is expanded
+        counters["stale_pops"] = max(0, counters["pops"] - sum(algorithm.expanded))
+        times = dict(self.times)
+        times["other"] = max(0, total - sum(times.values()))
+        times["total"] = total
+        return {
+            "name": algorithm.name,
+            "start": algorithm.start,
+            "goal": algorithm.goal,
+            "cost": algorithm.cost,
+            "path_length": len(algorithm.path),
+            "iterations": algorithm.iterations,
+            "expanded": list(algorithm.expanded),
+            "peak_queue": algorithm.peak_queue,
+            "counters": counters,
+            "time_ns": times,
+        }
+
+    def dump(self, algorithm, logger):
+        """
+        Write the report of the run that just ended
+        """
+        report = json.dumps(self.report(algorithm))
+        if self.output is None:
+            logger.info(f"Instrumentation: {report}")
+        else:
+            with open(self.output, "a" if self._written else "w") as f:
+                f.write(report + "\n")
+            self._written = True
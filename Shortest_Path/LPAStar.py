@@ -0,0 +1,192 @@
+import heapq
+
+HEURISTIC_SLACK = 1e-9
+
+
+def read_changes(file_name):
+    """
+    Read a stream of edge weight changes, one "source destination weight" change per line.
+    A weight of inf closes the edge. Consecutive lines form a batch applied at once,
+    batches are separated by blank lines.
+    """
+    batches = [[]]
+    with open(file_name, "r") as f:
+        for line in f:
+            fields = line.split()
+            if len(fields) == 0:
+                if len(batches[-1]) != 0:
+                    batches.append([])
+                continue
+            batches[-1].append((int(fields[0]), int(fields[1]), float(fields[2])))
+    if len(batches[-1]) == 0:
+        batches.pop()
+    return batches
+
+
+class LPAStar:
+    """
+    Lifelong Planning A* (LPA*) between a fixed start and goal on an undirected graph
+    whose edge weights can change.
+
+    Each node keeps g, its current distance from start, and rhs, the one step lookahead
+    min(g(n) + w(n, node)) over its neighbors. A node is inconsistent when both differ,
+    only inconsistent nodes are queued, so after a change of weights the search only
+    expands the nodes whose distance is affected instead of restarting from scratch.
+    The heuristic must be consistent for the new weights, decreasing a weight below
+    the geometric distance of its nodes requires the Dijkstra heuristic.
+    """
+
+    def __init__(self, neighbors, start, goal, h):
+        # neighbors(node) gives the (neighbor, weight) pairs of the initial graph,
+        # h[node] is the heuristic between node and goal
+        self._neighbors = neighbors
+        self.start = start
+        self.goal = goal
+        # The heuristic is shrunk by a tiny factor: with a tight heuristic such as the
+        # landmarks, rounding errors in g + h could otherwise order a node supporting
+        # the goal after the goal itself and stop the repair too early
+        self.h = [x * (1 - HEURISTIC_SLACK) for x in h]
+        # Adjacency of the current graph, copied from neighbors on first access of a node
+        self.adj = {}
+        self.g = {}
+        self.rhs = {start: 0}
+        # Lazy priority queue, the current key of each queued node is kept in open_keys
+        self.q = [(self.key(start), start)]
+        self.open_keys = {start: self.q[0][0]}
+        # Statistics of the last call to compute_shortest_path
+        self.expanded = 0
+        self.touched = set()
+
+    def neighbors(self, node):
+        """
+        Return the current weights of the edges of node as a {neighbor: weight} dictionary
+        """
+        adjacency = self.adj.get(node)
+        if adjacency is None:
+            adjacency = {}
+            for n, weight in self._neighbors(node):
+                if n not in adjacency or weight < adjacency[n]:
+                    adjacency[n] = weight
+            self.adj[node] = adjacency
+        return adjacency
+
+    def key(self, node):
+        k = min(self.g.get(node, float("inf")), self.rhs.get(node, float("inf")))
+        return (k + self.h[node], k)
+
+    def update_vertex(self, node):
+        """
+        Queue node if it is inconsistent, remove it from the queue otherwise
+        """
+        self.touched.add(node)
+        if self.g.get(node, float("inf")) != self.rhs.get(node, float("inf")):
+            key = self.key(node)
+            if self.open_keys.get(node) != key:
+                self.open_keys[node] = key
+                heapq.heappush(self.q, (key, node))
+        else:
+            self.open_keys.pop(node, None)
+
+    def recompute_rhs(self, node):
+        if node == self.start:
+            return
+        self.rhs[node] = min(
+            (
+                self.g.get(n, float("inf")) + weight
+                for n, weight in self.neighbors(node).items()
+            ),
+            default=float("inf"),
+        )
+
+    def top_key(self):
+        # drop the stale entries, nodes removed from the queue or queued again with another key
+        while len(self.q) != 0:
+            (key, node) = self.q[0]
+            if self.open_keys.get(node) == key:
+                return key
+            heapq.heappop(self.q)
+        return (float("inf"), float("inf"))
+
+    def compute_shortest_path(self):
+        """
+        Expand the inconsistent nodes until the distance of goal is known.
+        Return the cost of the shortest path, inf if goal cannot be reached
+        """
+        self.expanded = 0
+        g = self.g
+        rhs = self.rhs
+        while self.top_key() < self.key(self.goal) or g.get(
+            self.goal, float("inf")
+        ) != rhs.get(self.goal, float("inf")):
+            if len(self.q) == 0:
+                break
+            (_, node) = heapq.heappop(self.q)
+            del self.open_keys[node]
+            self.expanded += 1
+            self.touched.add(node)
+            if g.get(node, float("inf")) > rhs[node]:
+                # overconsistent: the distance of node decreased
+                g[node] = rhs[node]
+                for n, weight in self.neighbors(node).items():
+                    if n != self.start and g[node] + weight < rhs.get(
+                        n, float("inf")
+                    ):
+                        rhs[n] = g[node] + weight
+                        self.update_vertex(n)
+            else:
+                # underconsistent: the distance of node increased
+                g_old = g.get(node, float("inf"))
+                g[node] = float("inf")
+                for n, weight in self.neighbors(node).items():
+                    if rhs.get(n) == g_old + weight:
+                        self.recompute_rhs(n)
+                        self.update_vertex(n)
+                self.recompute_rhs(node)
+                self.update_vertex(node)
+        return g.get(self.goal, float("inf"))
+
+    def change_edge(self, u, v, weight):
+        """
+        Set the weight of the edge u-v, the edge is added if it does not exist yet
+        """
+        old = self.neighbors(u).get(v, float("inf"))
+        self.neighbors(u)[v] = weight
+        self.neighbors(v)[u] = weight
+        for (a, b) in ((u, v), (v, u)):
+            if a == self.start:
+                continue
+            g_b = self.g.get(b, float("inf"))
+            if weight < old:
+                if g_b + weight < self.rhs.get(a, float("inf")):
+                    self.rhs[a] = g_b + weight
+            elif self.rhs.get(a) == g_b + old:
+                # a may have been supported by the edge, its lookahead has to be recomputed
+                self.recompute_rhs(a)
+            self.update_vertex(a)
+
+    def replan(self, changes):
+        """
+        Apply a batch of (source, destination, weight) changes and repair the shortest path.
+        Return its new cost, the nodes touched by the repair are left in touched
+        """
+        self.touched = set()
+        for (u, v, weight) in changes:
+            self.change_edge(u, v, weight)
+        return self.compute_shortest_path()
+
+    def path(self):
+        """
+        Follow the best predecessors from goal back to start, empty if goal cannot be reached
+        """
+        if self.g.get(self.goal, float("inf")) == float("inf"):
+            return []
+        path = [self.goal]
+        node = self.goal
+        while node != self.start:
+            node = min(
+                self.neighbors(node).items(),
+                key=lambda item: self.g.get(item[0], float("inf")) + item[1],
+            )[0]
+            path.append(node)
+        path.reverse()
+        return path
@@ -0,0 +1,102 @@
+import os
+
+import numpy as np
+
+
+class Landmarks:
+    """
+    Landmark distance tables for the ALT heuristic (A*, Landmarks, Triangle inequality).
+    For a landmark L, the triangle inequality gives |d(L, b) - d(L, a)| <= d(a, b),
+    the heuristic is the best of these bounds over all landmarks.
+    The graphs are undirected, so the distances from and to a landmark are the same table.
+    """
+
+    def __init__(self, landmarks, distances):
+        # landmarks is the list of the selected node ids
+        # distances is a (k, V) array, distances[i][v] is the shortest distance between landmarks[i] and v
+        self.landmarks = list(landmarks)
+        self.distances = np.asarray(distances, dtype=np.float64)
+        # Rows as lists, faster than NumPy scalar indexing in the search loop
+        self._rows = [
+            [d if d != float("inf") else None for d in row]
+            for row in self.distances.tolist()
+        ]
+
+    @classmethod
+    def select(cls, graph, k, first=0):
+        """
+        Pick k landmarks with the farthest point strategy: each new landmark is the node
+        that maximizes its distance to the closest landmark already selected
+        """
+        k = min(k, graph.V)
+        distances = []
+        landmarks = []
+        # The first landmark is the farthest node from an arbitrary one, it lies on the border of the graph
+        candidates = graph.sssp(first)
+        candidates[~np.isfinite(candidates)] = -1
+        landmark = int(np.argmax(candidates))
+        closest = np.full(graph.V, np.inf)
+        for _ in range(k):
+            landmarks.append(landmark)
+            dist = graph.sssp(landmark)
+            distances.append(dist)
+            closest = np.minimum(closest, dist)
+            # nodes that cannot be reached from the landmarks are never selected
+            candidates = np.where(np.isfinite(closest), closest, -1)
+            candidates[landmarks] = -1
+            landmark = int(np.argmax(candidates))
+        return cls(landmarks, np.array(distances))
+
+    @classmethod
+    def load_or_build(cls, file_handler, graph, k, logger):
+        """
+        Load the landmark tables stored next to the instance, or compute and save them
+        """
+        path = os.path.join(file_handler.cache_path(), f"landmarks_{k}.npz")
+        stamp = file_handler.source_stamp()
+        try:
+            with np.load(path) as data:
+                if all(data[key] == stamp[key] for key in stamp):
+                    logger.debug(f"Landmarks loaded from {path}")
+                    return cls(data["landmarks"], data["distances"])
+        except (OSError, KeyError, ValueError):
+            pass
+
+        logger.info(f"Computing {k} landmarks")
+        landmarks = cls.select(graph, k)
+        try:
+            os.makedirs(file_handler.cache_path(), exist_ok=True)
+            np.savez(
+                path,
+                landmarks=np.array(landmarks.landmarks),
+                distances=landmarks.distances,
+                **stamp,
+            )
+        except OSError:
+            pass
+        return landmarks
+
+    def heuristic(self, a, b):
+        """
+        Lower bound of the distance between node a and b
+        """
+        best = 0
+        for row in self._rows:
+            da = row[a]
+            db = row[b]
+            if da is not None and db is not None:
+                d = abs(da - db)
+                if d > best:
+                    best = d
+        return best
+
+    def heuristic_to(self, goal):
+        """
+        Lower bounds of the distances between every node and goal, as an array
+        """
+        to_goal = self.distances[:, goal : goal + 1]
+        valid = np.isfinite(self.distances) & np.isfinite(to_goal)
+        # inf - inf is only computed where both distances are finite
+        bounds = np.zeros(self.distances.shape)
+        np.subtract(self.distances, to_goal, where=valid, out=bounds)
+        return np.abs(bounds).max(axis=0, initial=0)
@@ -0,0 +1,197 @@
+import heapq
+import struct
+
+# Open list implementations selectable with --queue
+QUEUES = ["binary", "pairing", "radix"]
+
+
+class BinaryHeap:
+    """
+    Binary heap of the heapq module. A node whose cost improves is pushed again,
+    the outdated entries are skipped by the search when they are popped.
+    Entries are (f, g, node) tuples, the smallest one is popped first.
+    """
+
+    def __init__(self):
+        self.heap = []
+
+    def push(self, entry):
+        heapq.heappush(self.heap, entry)
+
+    def pop(self):
+        return heapq.heappop(self.heap)
+
+    def __len__(self):
+        return len(self.heap)
+
+    def __iter__(self):
+        return iter(self.heap)
+
+
+class PairingHeap:
+    """
+    Pairing heap with decrease-key: each node has at most one entry, pushing a node
+    that is already queued with a smaller entry decreases its key instead of adding
+    an outdated entry. The last element of an entry is the node.
+    """
+
+    def __init__(self):
+        # A heap node is a list [entry, first child, next sibling, previous], previous
+        # being the parent for a first child and the previous sibling otherwise
+        self.root = None
+        self.size = 0
+        # heap node of each queued node
+        self.handles = {}
+
+    def push(self, entry):
+        handle = self.handles.get(entry[-1])
+        if handle is not None:
+            if entry < handle[0]:
+                self._decrease(handle, entry)
+            return
+        handle = [entry, None, None, None]
+        self.handles[entry[-1]] = handle
+        self.root = self._meld(self.root, handle)
+        self.size += 1
+
+    def pop(self):
+        root = self.root
+        del self.handles[root[0][-1]]
+        self.root = self._merge_pairs(root[1])
+        self.size -= 1
+        return root[0]
+
+    def _decrease(self, handle, entry):
+        handle[0] = entry
+        if handle is self.root:
+            return
+        # cut the subtree of handle from its parent and meld it with the root
+        (_, _, following, previous) = handle
+        if previous[1] is handle:
+            previous[1] = following
+        else:
+            previous[2] = following
+        if following is not None:
+            following[3] = previous
+        handle[2] = None
+        handle[3] = None
+        self.root = self._meld(self.root, handle)
+
+    @staticmethod
+    def _meld(a, b):
+        """
+        Meld two roots, the greater one becomes the first child of the other
+        """
+        if a is None:
+            return b
+        if b is None:
+            return a
+        if b[0] < a[0]:
+            a, b = b, a
+        child = a[1]
+        b[2] = child
+        if child is not None:
+            child[3] = b
+        b[3] = a
+        a[1] = b
+        return a
+
+    @classmethod
+    def _merge_pairs(cls, first):
+        """
+        Two pass merge of a list of siblings: meld them by pairs from left to right,
+        then meld the results from right to left
+        """
+        pairs = []
+        while first is not None:
+            a = first
+            b = a[2]
+            if b is None:
+                a[3] = None
+                pairs.append(a)
+                break
+            first = b[2]
+            a[2] = a[3] = b[2] = b[3] = None
+            pairs.append(cls._meld(a, b))
+        if len(pairs) == 0:
+            return None
+        root = pairs.pop()
+        while len(pairs) != 0:
+            root = cls._meld(pairs.pop(), root)
+        return root
+
+    def __len__(self):
+        return self.size
+
+    def __iter__(self):
+        stack = [self.root] if self.root is not None else []
+        while len(stack) != 0:
+            handle = stack.pop()
+            yield handle[0]
+            if handle[1] is not None:
+                stack.append(handle[1])
+            if handle[2] is not None:
+                stack.append(handle[2])
+
+
+_pack_double = struct.Struct("<d").pack
+
+
+class RadixHeap:
+    """
+    Radix heap for monotone keys: the popped keys never decrease, as the f values of A*
+    with a consistent heuristic. The key of an entry is the bit pattern of its first
+    element, the IEEE 754 patterns of non-negative doubles have the same order as the values,
+    so the (rounded) float costs are kept exactly. Bucket i holds the entries whose key
+    first differs from the last popped key at bit i - 1, an entry is moved to a lower
+    bucket at most 64 times. A key below the last popped key, caused by a slightly
+    inconsistent heuristic, is clamped to it.
+    """
+
+    def __init__(self):
+        self.buckets = [[] for _ in range(65)]
+        self.last = 0
+        self.size = 0
+
+    def push(self, entry):
+        key = int.from_bytes(_pack_double(entry[0]), "little")
+        if key < self.last:
+            key = self.last
+        self.buckets[(key ^ self.last).bit_length()].append((key, entry))
+        self.size += 1
+
+    def pop(self):
+        buckets = self.buckets
+        if len(buckets[0]) == 0:
+            i = 1
+            while len(buckets[i]) == 0:
+                i += 1
+            # the smallest key of the first non empty bucket becomes the last key,
+            # each entry of the bucket then goes to a lower bucket
+            items = buckets[i]
+            buckets[i] = []
+            last = min(item[0] for item in items)
+            self.last = last
+            for item in items:
+                buckets[(item[0] ^ last).bit_length()].append(item)
+        self.size -= 1
+        return buckets[0].pop()[1]
+
+    def __len__(self):
+        return self.size
+
+    def __iter__(self):
+        for bucket in self.buckets:
+            for (_, entry) in bucket:
+                yield entry
+
+
+def make_queue(kind):
+    """
+    Return an empty open list of the given kind, one of QUEUES
+    """
+    if kind == "pairing":
+        return PairingHeap()
+    if kind == "radix":
+        return RadixHeap()
+    return BinaryHeap()
@@ -0,0 +1,155 @@
+import math
+
+import numpy as np
+
+
+class GridIndex:
+    """
+    Uniform grid over the coordinates of the vertices.
+    The vertices are sorted by cell, those of cell c are nodes[cell_start[c]:cell_start[c + 1]]
+    (same layout as the CSR adjacency), so finding the vertices around a point only
+    looks at the few cells close to it instead of scanning every vertex.
+    """
+
+    def __init__(self, coords, cell_size=None):
+        self.coords = np.asarray(coords, dtype=np.float64).reshape(-1, 2)
+        V = len(self.coords)
+        if V == 0:
+            self.origin = np.zeros(2)
+            span = np.zeros(2)
+        else:
+            self.origin = self.coords.min(axis=0)
+            span = self.coords.max(axis=0) - self.origin
+        if cell_size is None:
+            # about one vertex per cell
+            cell_size = math.sqrt(span[0] * span[1] / max(V, 1))
+            if cell_size == 0:
+                cell_size = max(span.max(), 1) / max(math.sqrt(V), 1)
+        self.cell_size = float(cell_size)
+        self.shape = (
+            int(span[0] // self.cell_size) + 1,
+            int(span[1] // self.cell_size) + 1,
+        )
+
+        cells = self.cell_of(self.coords)
+        self.nodes = np.argsort(cells, kind="stable")
+        self.cell_start = np.zeros(self.shape[0] * self.shape[1] + 1, dtype=np.int64)
+        np.cumsum(
+            np.bincount(cells, minlength=self.shape[0] * self.shape[1]),
+            out=self.cell_start[1:],
+        )
+
+        # Plain list copies for the per query loops
+        self._nodes = self.nodes.tolist()
+        self._cell_start = self.cell_start.tolist()
+        self._coords = self.coords.tolist()
+        self._origin = self.origin.tolist()
+
+    def cell_of(self, points):
+        """
+        Return the cell number of each point, points outside the grid are moved to its border
+        """
+        ij = np.floor((points - self.origin) / self.cell_size).astype(np.int64)
+        i = np.clip(ij[:, 0], 0, self.shape[0] - 1)
+        j = np.clip(ij[:, 1], 0, self.shape[1] - 1)
+        return i * self.shape[1] + j
+
+    def _cell(self, x, y):
+        i = int((x - self._origin[0]) // self.cell_size)
+        j = int((y - self._origin[1]) // self.cell_size)
+        return (
+            min(max(i, 0), self.shape[0] - 1),
+            min(max(j, 0), self.shape[1] - 1),
+        )
+
+    def _cell_nodes(self, i, j):
+        c = i * self.shape[1] + j
+        return self._nodes[self._cell_start[c] : self._cell_start[c + 1]]
+
+    def nearest(self, x, y):
+        """
+        Return the vertex closest to the point (x, y), -1 if there is no vertex.
+        The rings of cells around the point are searched until no unexplored cell
+        can hold a closer vertex
+        """
+        (ci, cj) = self._cell(x, y)
+        (ni, nj) = self.shape
+        (ox, oy) = self._origin
+        size = self.cell_size
+        best = -1
+        best_distance = float("inf")
+        ring = 0
+        while True:
+            i_min, i_max = ci - ring, ci + ring
+            j_min, j_max = cj - ring, cj + ring
+            for i in range(max(i_min, 0), min(i_max, ni - 1) + 1):
+                if i == i_min or i == i_max:
+                    columns = range(max(j_min, 0), min(j_max, nj - 1) + 1)
+                else:
+                    columns = [j for j in (j_min, j_max) if 0 <= j < nj]
+                for j in columns:
+                    for node in self._cell_nodes(i, j):
+                        (nx, ny) = self._coords[node]
+                        distance = (nx - x) ** 2 + (ny - y) ** 2
+                        if distance < best_distance:
+                            best = node
+                            best_distance = distance
+
+            if i_min <= 0 and j_min <= 0 and i_max >= ni - 1 and j_max >= nj - 1:
+                break
+            # any vertex of an unexplored cell is farther than the sides of the explored
+            # square that are inside the grid
+            sides = []
+            if i_min > 0:
+                sides.append(x - (ox + i_min * size))
+            if i_max < ni - 1:
+                sides.append(ox + (i_max + 1) * size - x)
+            if j_min > 0:
+                sides.append(y - (oy + j_min * size))
+            if j_max < nj - 1:
+                sides.append(oy + (j_max + 1) * size - y)
+            bound = max(min(sides), 0)
+            if best_distance <= bound ** 2:
+                break
+            ring += 1
+        return best
+
+    def in_box(self, x_min, y_min, x_max, y_max):
+        """
+        Return the array of the vertices inside the box, borders included
+        """
+        (i_min, j_min) = self._cell(x_min, y_min)
+        (i_max, j_max) = self._cell(x_max, y_max)
+        candidates = np.concatenate(
+            [
+                self.nodes[
+                    self.cell_start[i * self.shape[1] + j_min] : self.cell_start[
+                        i * self.shape[1] + j_max + 1
+                    ]
+                ]
+                for i in range(i_min, i_max + 1)
+            ]
+        )
+        points = self.coords[candidates]
+        inside = (
+            (points[:, 0] >= x_min)
+            & (points[:, 0] <= x_max)
+            & (points[:, 1] >= y_min)
+            & (points[:, 1] <= y_max)
+        )
+        return candidates[inside]
+
+    def corridor(self, a, b, margin):
+        """
+        Return the vertices inside the bounding box of the vertices a and b, expanded on
+        each side by margin times its largest side (at least one cell)
+        """
+        (xa, ya) = self._coords[a]
+        (xb, yb) = self._coords[b]
+        extent = max(margin * max(abs(xa - xb), abs(ya - yb)), self.cell_size)
+        return self.in_box(
+            min(xa, xb) - extent,
+            min(ya, yb) - extent,
+            max(xa, xb) + extent,
+            max(ya, yb) + extent,
+        )
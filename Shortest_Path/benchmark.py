@@ -0,0 +1,223 @@
+from Algorithm import Algorithm, Heuristic, HEURISTICS
+from DistanceTable import DistanceTable
+from FileHandler import FileHandler
+from PriorityQueue import QUEUES
+import argparse
+import csv
+import glob
+import json
+import logging
+import multiprocessing
+import os
+import sys
+import time
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+# Search modes compared by the benchmark: (is_bidirectional, bidirectional_mode)
+MODES = {
+    "unidirectional": (False, "first"),
+    "bidirectional": (True, "first"),
+    "bidirectional-optimal": (True, "optimal"),
+}
+
+FIELDS = [
+    "instance",
+    "heuristic",
+    "mode",
+    "backend",
+    "parents",
+    "queue",
+    "load_ms",
+    "search_ms",
+    "cost",
+    "iterations",
+    "expanded",
+    "peak_queue",
+    "peak_rss_kb",
+]
+
+
+def peak_rss_kb():
+    """
+    Peak resident set size of the current process in KB, None if unknown
+    """
+    if resource is None:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in KB on Linux
+    if sys.platform == "darwin":
+        rss //= 1024
+    return rss
+
+
+def run_one(instance, heuristic, mode, backend, parents, queue, repeat):
+    """
+    Load the instance and run the search repeat times, executed in a fresh process
+    so that the peak RSS only accounts for this configuration
+    """
+    logger = logging.getLogger("shortest-path-benchmark")
+    logger.setLevel(logging.WARNING)
+    (is_bidirectional, bidirectional_mode) = MODES[mode]
+
+    start = time.perf_counter()
+    algorithm = Algorithm(
+        instance,
+        heuristic=heuristic,
+        is_bidirectional=is_bidirectional,
+        bidirectional_mode=bidirectional_mode,
+        backend=backend,
+        parent_pointers=parents,
+        queue=queue,
+        record="none",
+        logger=logger,
+    )
+    load = time.perf_counter() - start
+
+    search = []
+    for _ in range(repeat):
+        algorithm.reset(algorithm.start, algorithm.goal)
+        start = time.perf_counter()
+        algorithm.run()
+        search.append(time.perf_counter() - start)
+
+    return {
+        "instance": os.path.basename(instance),
+        "heuristic": heuristic,
+        "mode": mode,
+        "backend": backend,
+        "parents": parents,
+        "queue": queue,
+        "load_ms": round(load * 1000, 3),
+        "search_ms": round(min(search) * 1000, 3),
+        "cost": round(algorithm.cost, 2),
+        "iterations": algorithm.iterations,
+        "expanded": sum(algorithm.expanded),
+        "peak_queue": algorithm.peak_queue,
+        "peak_rss_kb": peak_rss_kb(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark of the shortest path searches"
+    )
+    parser.add_argument(
+        "--datasets",
+        type=str,
+        nargs="+",
+        help="Instances to run, default is every file of the datasets folder",
+        default=sorted(glob.glob(os.path.join("datasets", "*.txt"))),
+    )
+    parser.add_argument(
+        "--heuristics",
+        type=str,
+        nargs="+",
+        help="Heuristics to compare, default is all but Exact whose all pairs distances are long to compute on large instances",
+        choices=HEURISTICS,
+        default=[h for h in HEURISTICS if h != Heuristic.EXACT],
+    )
+    parser.add_argument(
+        "--modes",
+        type=str,
+        nargs="+",
+        choices=list(MODES),
+        default=list(MODES),
+    )
+    parser.add_argument(
+        "--backend",
+        type=str,
+        choices=["networkx", "csr"],
+        default="csr",
+    )
+    parser.add_argument(
+        "-p",
+        "--parents",
+        action="store_true",
+        help="rebuild the path from parent pointers instead of storing it in the queue",
+    )
+    parser.add_argument(
+        "--queues",
+        type=str,
+        nargs="+",
+        help="Open lists compared on the unidirectional search, any other than binary implies --parents",
+        choices=QUEUES,
+        default=["binary"],
+    )
+    parser.add_argument(
+        "--repeat",
+        type=int,
+        help="Number of runs of each search, the fastest one is reported",
+        default=3,
+    )
+    parser.add_argument(
+        "--processes",
+        type=int,
+        help="Number of processes used to precompute the distances of the Exact heuristic",
+        default=os.cpu_count(),
+    )
+    parser.add_argument(
+        "--output",
+        type=str,
+        help="Prefix of the report files, OUTPUT.csv and OUTPUT.json are written",
+        default="benchmark",
+    )
+    args = parser.parse_args()
+
+    logging.basicConfig(format="[%(levelname)s] : %(message)s")
+    logger = logging.getLogger("shortest-path")
+    logger.setLevel("INFO")
+
+    # the open lists are only pluggable in the search with parent pointers,
+    # which is then used for every queue so that they are compared on the same search
+    parents = args.parents or any(queue != "binary" for queue in args.queues)
+    results = []
+    # maxtasksperchild=1 gives a fresh process, and a fresh peak RSS, to each configuration
+    with multiprocessing.Pool(1, maxtasksperchild=1) as pool:
+        for instance in args.datasets:
+            if Heuristic.EXACT in args.heuristics:
+                # the pool workers cannot start processes, the distances are computed
+                # here and memory mapped from the instance cache by the workers
+                fh = FileHandler(instance)
+                DistanceTable.load_or_build(
+                    fh, fh.read_csr()[3], "all", None, logger, args.processes
+                )
+            for heuristic in args.heuristics:
+                for mode in args.modes:
+                    for queue in args.queues:
+                        # the open list can only be changed for the unidirectional search
+                        if queue != "binary" and MODES[mode][0]:
+                            continue
+                        result = pool.apply(
+                            run_one,
+                            (
+                                instance,
+                                heuristic,
+                                mode,
+                                args.backend,
+                                parents,
+                                queue,
+                                args.repeat,
+                            ),
+                        )
+                        logger.info(
+                            f"{result['instance']} {heuristic} {mode} {queue}: "
+                            f"{result['search_ms']:.2f}ms, {result['expanded']} nodes expanded, "
+                            f"cost {result['cost']:.2f}"
+                        )
+                        results.append(result)
+
+    with open(args.output + ".csv", "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=FIELDS)
+        writer.writeheader()
+        writer.writerows(results)
+    with open(args.output + ".json", "w") as f:
+        json.dump(results, f, indent=2)
+    logger.info(f"Report written to {args.output}.csv and {args.output}.json")
+
+
+if __name__ == "__main__":
+    main()
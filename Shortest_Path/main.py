@@ -1,7 +1,14 @@
 from Algorithm import Algorithm, HEURISTICS
+from Instrumentation import Instrumentation
+from History import RECORD_MODES
+from LPAStar import read_changes
+from PriorityQueue import QUEUES
+import Batch
+import sys
 import argparse
 import os
 import logging
+import time
 from pathlib import Path
 
 
@@ -16,6 +23,13 @@ def main():
         choices=HEURISTICS,
         default="Mean",
     )
+    parser.add_argument(
+        "--landmarks",
+        type=int,
+        help="Number of landmarks used by the Landmarks heuristic",
+        required=False,
+        default=8,
+    )
     parser.add_argument(
         "--instance",
         type=str,
@@ -30,6 +44,136 @@ def main():
         help="bidirectionnal",
         required=False,
     )
+    parser.add_argument(
+        "--bidirect-mode",
+        type=str,
+        help=(
+            "first: stop when both searches meet, optimal: stop once the best meeting "
+            "cost is proven"
+        ),
+        required=False,
+        choices=["first", "optimal"],
+        default="first",
+    )
+    parser.add_argument(
+        "--engine",
+        type=str,
+        help="astar: A* search, ch: query a contraction hierarchy (built on first use)",
+        required=False,
+        choices=["astar", "ch"],
+        default="astar",
+    )
+    parser.add_argument(
+        "--backend",
+        type=str,
+        help="Graph representation used by the search",
+        required=False,
+        choices=["networkx", "csr"],
+        default="networkx",
+    )
+    parser.add_argument(
+        "-p",
+        "--parents",
+        action="store_true",
+        help="rebuild the path from parent pointers instead of storing it in the queue",
+        required=False,
+    )
+    parser.add_argument(
+        "--queue",
+        type=str,
+        help=(
+            "Open list of the unidirectional search with parent pointers "
+            "(binary heap, pairing heap with decrease-key, radix heap), other than "
+            "binary it implies -p"
+        ),
+        required=False,
+        choices=QUEUES,
+        default="binary",
+    )
+    parser.add_argument(
+        "--record",
+        type=str,
+        help="Search history recorded for the GUI",
+        required=False,
+        choices=RECORD_MODES,
+        default="full",
+    )
+    parser.add_argument(
+        "--record-every",
+        type=int,
+        help="Record one iteration out of RECORD_EVERY in sampled mode",
+        required=False,
+        default=10,
+    )
+    parser.add_argument(
+        "--record-budget",
+        type=int,
+        help="Maximum number of queue states stored in sampled mode",
+        required=False,
+        default=1000000,
+    )
+    parser.add_argument(
+        "--corridor",
+        type=float,
+        help=(
+            "Only visit the nodes inside the start-goal bounding box expanded by "
+            "CORRIDOR times its largest side"
+        ),
+        required=False,
+    )
+    parser.add_argument(
+        "--queries",
+        type=str,
+        help="CSV file of source,target queries answered in batch (no GUI)",
+        required=False,
+    )
+    parser.add_argument(
+        "--matrix",
+        action="store_true",
+        help=(
+            "with --queries, output the distance matrix between "
+            "all sources and all targets"
+        ),
+        required=False,
+    )
+    parser.add_argument(
+        "--processes",
+        type=int,
+        help=(
+            "Number of processes used to answer the queries and to precompute the "
+            "distances of the Exact heuristic"
+        ),
+        required=False,
+        default=os.cpu_count(),
+    )
+    parser.add_argument(
+        "--output",
+        type=str,
+        help="Output file of the batch results, default is the standard output",
+        required=False,
+    )
+    parser.add_argument(
+        "--changes",
+        type=str,
+        help=(
+            "File of edge weight changes (source destination weight per line, "
+            "batches separated by blank lines), the path is repaired with LPA* "
+            "after each batch"
+        ),
+        required=False,
+    )
+    parser.add_argument(
+        "--profile",
+        type=str,
+        nargs="?",
+        const="-",
+        help=(
+            "Count the queue operations, edge relaxations and heuristic evaluations "
+            "and time each phase of the search, the JSON report is written to PROFILE "
+            "or logged without file"
+        ),
+        required=False,
+    )
     parser.add_argument(
         "--log",
         dest="logLevel",
@@ -49,21 +193,92 @@ def main():
         logger.warning('Instance "{}" not found'.format(instance))
         exit(1)
 
+    if args.queries is not None:
+        run_batch(args, logger)
+        return
+
     algorithm = Algorithm(
         instance,
         heuristic=args.heuristic,
+        landmarks=args.landmarks,
+        engine=args.engine,
         logger=logger,
         is_bidirectional=args.bidirect,
+        bidirectional_mode=args.bidirect_mode,
+        backend=args.backend,
+        parent_pointers=args.parents,
+        record=args.record,
+        record_every=args.record_every,
+        record_budget=args.record_budget,
+        corridor=args.corridor,
+        queue=args.queue,
+        processes=args.processes,
+        instrumentation=None
+        if args.profile is None
+        else Instrumentation(None if args.profile == "-" else args.profile),
     )
-    algorithm.run()
-    if len(algorithm.G.nodes) > 50:
+    changes = None
+    if args.changes is not None:
+        if not os.path.isfile(args.changes):
+            logger.warning('Changes "{}" not found'.format(args.changes))
+            exit(1)
+        changes = read_changes(args.changes)
+    algorithm.run(changes)
+    if len(algorithm.history) == 0:
+        logger.info("No search history recorded, nothing to draw")
+        return
+    if algorithm.V > 50:
         answer = input(
-            f"Many nodes to draw ({len(algorithm.G.nodes)}), confirm drawing? [y/N]\n"
+            f"Many nodes to draw ({algorithm.V}), confirm drawing? [y/N]\n"
         )
         if answer != "y":
             return
     algorithm.show()
 
 
+def run_batch(args, logger):
+    """
+    Answer all the queries of the --queries file on the loaded instance
+    """
+    if not os.path.isfile(args.queries):
+        logger.warning('Queries "{}" not found'.format(args.queries))
+        exit(1)
+    queries = Batch.snap_queries(args.instance, Batch.read_queries(args.queries))
+    logger.info(f"{len(queries)} queries loaded")
+    start = time.time()
+    if args.matrix:
+        sources = sorted(set(q[0] for q in queries))
+        targets = sorted(set(q[1] for q in queries))
+        matrix = Batch.distance_matrix(
+            args.instance, sources, targets, processes=args.processes
+        )
+    else:
+        results = Batch.solve_queries(
+            args.instance,
+            queries,
+            processes=args.processes,
+            heuristic=args.heuristic,
+            landmarks=args.landmarks,
+            engine=args.engine,
+            is_bidirectional=args.bidirect,
+            bidirectional_mode=args.bidirect_mode,
+            parent_pointers=args.parents,
+            corridor=args.corridor,
+            queue=args.queue,
+        )
+    end = time.time()
+    logger.info(
+        f"Answered in {(end-start)*1000:.2f}ms with {args.processes} processes"
+    )
+
+    f = open(args.output, "w", newline="") if args.output else sys.stdout
+    if args.matrix:
+        Batch.write_matrix(f, sources, targets, matrix)
+    else:
+        Batch.write_results(f, results)
+    if args.output:
+        f.close()
+
+
 if __name__ == "__main__":
     main()